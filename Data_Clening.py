@@ -1,26 +1,44 @@
-import pandas as pd
+import argparse
 
-# Load dataset
-file_path = './healthcare_dataset.csv'
-data = pd.read_csv(file_path)
+from cleaning import clean_file
+from data_profile import load_profile, profile_date_formats, profile_path
+from data_store import CLEANED_CSV_PATH, CLEANED_STORE_PATH, RAW_DATA_PATH
+from quantiles import QUANTILE_PATH
+from rollups import ROLLUP_PATH
+
+parser = argparse.ArgumentParser(description="Clean the healthcare dataset.")
+parser.add_argument('--chunk-size', type=int, default=None,
+                    help="Stream the input this many rows at a time instead of loading it all at once")
+parser.add_argument('--csv', action='store_true',
+                    help=f"Also write {CLEANED_CSV_PATH} next to the columnar store")
+parser.add_argument('--fuzzy', action='store_true',
+                    help="Also drop near-duplicates: same admission date, name and hospital up to case and spacing")
+args = parser.parse_args()
 
-# 1. Normalize 'Name' column
-data['Name'] = data['Name'].str.title()
+# Load dataset
+file_path = RAW_DATA_PATH
 
-# 2. Convert date columns to datetime
-data['Date of Admission'] = pd.to_datetime(data['Date of Admission'])
-data['Discharge Date'] = pd.to_datetime(data['Discharge Date'])
+# A current profile (from analyze_healthcare_data.py) supplies the date formats; otherwise
+# the file is profiled while it is cleaned
+profile = load_profile(profile_path(file_path), source=file_path)
 
-# 3. Check for duplicates
-duplicates = data.duplicated().sum()
+# Clean dataset (normalize names, parse dates, drop duplicates)
+cleaned_file_path = CLEANED_CSV_PATH if args.csv else None
+duplicates, near_duplicates, missing_values = clean_file(file_path, cleaned_file_path, chunk_size=args.chunk_size,
+                                                         store_path=CLEANED_STORE_PATH, rollup_path=ROLLUP_PATH,
+                                                         fuzzy=args.fuzzy,
+                                                         date_formats=profile_date_formats(profile) if profile else None,
+                                                         profile_path=None if profile else profile_path(file_path),
+                                                         quantile_path=QUANTILE_PATH)
 print(f"Number of duplicate rows: {duplicates}")
-data = data.drop_duplicates()
-
-# 4. Handle missing values (if any)
-missing_values = data.isnull().sum()
+if args.fuzzy:
+    print(f"Number of near-duplicate rows: {near_duplicates}")
 print(f"Missing values in each column:\n{missing_values}")
 
-# Save cleaned data
-cleaned_file_path = 'cleaned_healthcare_data.csv'
-data.to_csv(cleaned_file_path, index=False)
-print(f"Cleaned dataset saved to {cleaned_file_path}.")
+print(f"Cleaned dataset saved to {CLEANED_STORE_PATH}.")
+print(f"Aggregate rollup saved to {ROLLUP_PATH}.")
+print(f"Quantile sketches saved to {QUANTILE_PATH}.")
+if profile is None:
+    print(f"Profile of the raw file saved to {profile_path(file_path)}.")
+if cleaned_file_path is not None:
+    print(f"Cleaned dataset saved to {cleaned_file_path}.")
@@ -0,0 +1,34 @@
+import argparse
+
+import matplotlib.pyplot as plt
+
+import analytics
+import report_charts
+from readmissions import READMISSION_WINDOW, PatientIndex
+
+parser = argparse.ArgumentParser(description="Readmission analysis charts.")
+parser.add_argument('--window', type=int, default=READMISSION_WINDOW,
+                    help="Days after discharge within which a new admission counts as a readmission")
+parser.add_argument('--hospitals', type=int, default=10, help="Number of hospitals (by number of stays) to chart")
+parser.add_argument('--output', default=None, help="Also save every readmission (both stays) to this CSV file")
+args = parser.parse_args()
+
+# Load the cleaned dataset (only the columns used below) and sort it by patient once
+data = analytics.load_data(columns=['Name', 'Age', 'Gender', 'Medical Condition', 'Hospital',
+                                    'Date of Admission', 'Discharge Date'])
+index = PatientIndex(data)
+readmitted = index.readmitted(args.window)
+print(f"{readmitted.sum()} of {len(readmitted)} stays ({readmitted.mean():.2%}) "
+      f"were followed by a readmission within {args.window} days.")
+
+# Readmission rate per medical condition
+report_charts.readmission_by_condition(analytics.readmission_by_condition(data, readmitted))
+plt.show()
+
+# Readmission rate of the busiest hospitals
+report_charts.readmission_by_hospital(analytics.readmission_by_hospital(data, readmitted, n=args.hospitals))
+plt.show()
+
+if args.output:
+    index.readmissions(data, args.window).to_csv(args.output, index=False)
+    print(f"Readmissions saved to {args.output}.")
@@ -1,38 +1,44 @@
-import pandas as pd
-import seaborn as sns
+import argparse
+
 import matplotlib.pyplot as plt
 
-# Load the dataset
-file_path = "healthcare_dataset.csv"  # Update with the correct path if necessary
-data = pd.read_csv(file_path)
+import analytics
+import report_charts
+import sharded
+
+parser = argparse.ArgumentParser(description="Treatment analysis charts.")
+parser.add_argument('--parallel', action='store_true',
+                    help="Aggregate the columnar store in parallel shards instead of one frame")
+parser.add_argument('--workers', type=int, default=None, help="Processes for --parallel (default: all cores)")
+args = parser.parse_args()
+
+if args.parallel:
+    metrics = sharded.treatment_metrics(workers=args.workers)
+else:
+    # Load the cleaned dataset (only the columns used below)
+    data = analytics.load_data(columns=['Admission Type', 'Medical Condition', 'Billing Amount', 'Medication'])
+    metrics = {
+        'admission_type_counts': analytics.admission_type_counts(data),
+        'avg_billing_by_condition': analytics.avg_billing_by_condition(data, n=10),
+        'top_medications': analytics.top_medications(data, n=10),
+    }
 
-# Ensure correct data types for date columns
-data['Date of Admission'] = pd.to_datetime(data['Date of Admission'])
-data['Discharge Date'] = pd.to_datetime(data['Discharge Date'])
+# Billing Amount quantiles per condition, read from the quantile sketches rather than the rows
+metrics['billing_quantiles_by_condition'] = analytics.billing_quantiles_by_condition(analytics.quantile_sketches())
+print(f"Billing Amount quantiles by medical condition:\n{metrics['billing_quantiles_by_condition'].round(2)}")
 
 # Admission types
-plt.figure(figsize=(8, 6))
-admission_counts = data['Admission Type'].value_counts()
-sns.barplot(x=admission_counts.index, y=admission_counts.values, palette='viridis')
-plt.title('Admission Types', fontsize=16)
-plt.xlabel('Admission Type', fontsize=12)
-plt.ylabel('Count', fontsize=12)
+report_charts.admission_types(metrics['admission_type_counts'])
 plt.show()
 
 # Average billing amount by medical condition
-plt.figure(figsize=(12, 6))
-avg_billing = data.groupby('Medical Condition')['Billing Amount'].mean().sort_values(ascending=False).head(10)
-sns.barplot(y=avg_billing.index, x=avg_billing.values, palette='magma')
-plt.title('Top 10 Medical Conditions by Average Billing Amount', fontsize=16)
-plt.xlabel('Average Billing Amount (USD)', fontsize=12)
-plt.ylabel('Medical Condition', fontsize=12)
+report_charts.avg_billing(metrics['avg_billing_by_condition'])
+plt.show()
+
+# Median and tail billing amount by medical condition
+report_charts.billing_quantiles(metrics['billing_quantiles_by_condition'])
 plt.show()
 
 # Medication frequency
-plt.figure(figsize=(10, 6))
-medication_counts = data['Medication'].value_counts().head(10)
-sns.barplot(y=medication_counts.index, x=medication_counts.values, palette='cubehelix')
-plt.title('Top 10 Medications', fontsize=16)
-plt.xlabel('Count', fontsize=12)
-plt.ylabel('Medication', fontsize=12)
+report_charts.top_medications(metrics['top_medications'])
 plt.show()
@@ -0,0 +1,183 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+from data_store import CLEANED_STORE_PATH, DATE_COLUMNS, compact_frame, load_cleaned, store_version
+from quantiles import build_sketches, load_sketches, sketch_quantiles
+from readmissions import READMISSION_WINDOW, PatientIndex, readmission_rates
+from rollups import LENGTH_OF_STAY, length_of_stay, month_labels
+from timeseries import daily_series, resample
+
+# Columns used by at least one report, so a batch run can load them all at once
+REPORT_COLUMNS = ['Age', 'Gender', 'Medical Condition', 'Date of Admission', 'Discharge Date', 'Medication',
+                  'Admission Type', 'Billing Amount', 'Name', 'Hospital']
+# Columns quantile sketches are built from
+SKETCH_COLUMNS = ['Medical Condition', 'Hospital', 'Date of Admission', 'Discharge Date', 'Billing Amount']
+
+
+# Store version last loaded from each path
+_loaded_versions = {}
+
+
+# Up to 8 column sets of the current store version; older versions are cleared by load_data
+@functools.lru_cache(maxsize=8)
+def _load(path, version, columns):
+    data = load_cleaned(None if columns is None else list(columns), path)
+    if all(col in data.columns for col in DATE_COLUMNS):
+        data[LENGTH_OF_STAY] = length_of_stay(data)
+    return compact_frame(data)
+
+
+def load_data(columns=None, path=CLEANED_STORE_PATH):
+    """Load the cleaned dataset (plus Length of Stay when both dates are loaded).
+
+    Loads are cached per column set for the current store version only (frames of a store
+    that has since been rewritten or appended to are dropped); the returned frame is shared
+    between callers, so copy it before modifying it.
+    """
+    version = store_version(path)
+    if _loaded_versions.setdefault(path, version) != version:
+        _load.cache_clear()
+        _loaded_versions[path] = version
+    return _load(path, version, None if columns is None else tuple(columns))
+
+
+def age_histogram(data, bins=20):
+    # (counts, bin edges), as np.histogram
+    return np.histogram(data['Age'].dropna(), bins=bins)
+
+
+def los_histogram(data, bins=30):
+    return np.histogram(data[LENGTH_OF_STAY].dropna(), bins=bins)
+
+
+def gender_counts(data):
+    return data['Gender'].value_counts()
+
+
+def admission_type_counts(data):
+    return data['Admission Type'].value_counts()
+
+
+def top_conditions(data, n=10):
+    return data['Medical Condition'].value_counts().head(n)
+
+
+def top_medications(data, n=10):
+    return data['Medication'].value_counts().head(n)
+
+
+def yearly_admissions(data, daily=None):
+    # Admissions per year, indexed by the year; `daily` is the frame's daily_series, if already built
+    yearly = resample(daily_series(data) if daily is None else daily, 'Year')['admissions']
+    yearly.index = yearly.index.year
+    return yearly
+
+
+def monthly_admissions(data, daily=None):
+    # Admissions per month, indexed by 'YYYY-MM'
+    counts = resample(daily_series(data) if daily is None else daily, 'Month')['admissions']
+    counts.index = month_labels(counts.index)
+    return counts
+
+
+def monthly_avg_los(data, daily=None):
+    means = resample(daily_series(data) if daily is None else daily, 'Month')['avg los']
+    means.index = month_labels(means.index)
+    return means
+
+
+def los_by_condition(data):
+    return data.groupby('Medical Condition', observed=True)[LENGTH_OF_STAY].mean()
+
+
+def avg_billing_by_condition(data, n=10):
+    return data.groupby('Medical Condition', observed=True)['Billing Amount'].mean().sort_values(ascending=False).head(n)
+
+
+def quantile_sketches(data=None):
+    # The sketches written by Data_Clening.py / ingest.py; built from `data` (or the store) if there are none
+    sketches = load_sketches()
+    if sketches is None:
+        sketches = build_sketches(load_data(columns=SKETCH_COLUMNS) if data is None else data)
+    return sketches
+
+
+def billing_quantiles_by_condition(sketches):
+    # Median, p90 and p99 Billing Amount per condition, highest median first
+    quantiles = sketch_quantiles(sketches, 'Billing Amount', 'Medical Condition')
+    return quantiles.sort_values('p50', ascending=False)
+
+
+def medication_condition_crosstab(data):
+    """Condition x medication counts in sparse (long) form: one row per pair that occurs.
+
+    Counted with a single bincount over the combined category codes, so no dense
+    condition x medication frame is built.
+    """
+    codes = {}
+    categories = {}
+    for col in ['Medical Condition', 'Medication']:
+        series = data[col] if isinstance(data[col].dtype, pd.CategoricalDtype) else data[col].astype('category')
+        codes[col] = series.cat.codes.to_numpy().astype('int64')
+        categories[col] = series.cat.categories
+    n_medications = len(categories['Medication'])
+    valid = (codes['Medical Condition'] >= 0) & (codes['Medication'] >= 0)
+    combined = codes['Medical Condition'][valid] * n_medications + codes['Medication'][valid]
+    counts = np.bincount(combined, minlength=len(categories['Medical Condition']) * n_medications)
+    pairs = np.flatnonzero(counts)
+    return pd.DataFrame({
+        'Medical Condition': categories['Medical Condition'].take(pairs // n_medications),
+        'Medication': categories['Medication'].take(pairs % n_medications),
+        'count': counts[pairs],
+    })
+
+
+def crosstab_totals(crosstab, by):
+    # Total count per condition or medication, largest first
+    return crosstab.groupby(by)['count'].sum().sort_values(ascending=False, kind='stable')
+
+
+def crosstab_slice(crosstab, conditions, medications):
+    # Dense condition x medication table of only the given conditions and medications
+    visible = crosstab[crosstab['Medical Condition'].isin(conditions) & crosstab['Medication'].isin(medications)]
+    return visible.pivot(index='Medical Condition', columns='Medication', values='count').reindex(
+        index=conditions, columns=medications, fill_value=0).fillna(0).astype('int64')
+
+
+def readmitted(data, window=READMISSION_WINDOW):
+    # Per row: whether the patient was readmitted within `window` days of the stay's discharge
+    return PatientIndex(data).readmitted(window)
+
+
+def readmission_by_condition(data, readmitted):
+    return readmission_rates(data, readmitted, 'Medical Condition').sort_values('rate', ascending=False)
+
+
+def readmission_by_hospital(data, readmitted, n=10):
+    # Rates of the `n` hospitals with the most stays
+    return readmission_rates(data, readmitted, 'Hospital').nlargest(n, 'stays').sort_values('rate', ascending=False)
+
+
+def all_metrics(data):
+    """Every report metric computed from a single frame (load it with REPORT_COLUMNS)."""
+    daily = daily_series(data)
+    readmitted_stays = readmitted(data)
+    sketches = quantile_sketches(data)
+    return {
+        'age_histogram': age_histogram(data),
+        'gender_counts': gender_counts(data),
+        'top_conditions': top_conditions(data),
+        'admission_type_counts': admission_type_counts(data),
+        'avg_billing_by_condition': avg_billing_by_condition(data),
+        'billing_quantiles_by_condition': billing_quantiles_by_condition(sketches),
+        'top_medications': top_medications(data),
+        'yearly_admissions': yearly_admissions(data, daily),
+        'los_histogram': los_histogram(data),
+        'monthly_admissions': monthly_admissions(data, daily),
+        'monthly_avg_los': monthly_avg_los(data, daily),
+        'los_by_condition': los_by_condition(data),
+        'readmission_by_condition': readmission_by_condition(data, readmitted_stays),
+        'readmission_by_hospital': readmission_by_hospital(data, readmitted_stays),
+    }
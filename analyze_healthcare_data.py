@@ -1,9 +1,19 @@
-import pandas as pd
+import argparse
 
-# Load the dataset
-file_path = './healthcare_dataset.csv'
-data = pd.read_csv(file_path)
+from data_profile import CHUNK_SIZE, profile_file, profile_path, profile_table, write_profile
+from data_store import RAW_DATA_PATH
 
-# View dataset structure
-print(data.info())
-print(data.head())
+parser = argparse.ArgumentParser(description="Profile a healthcare CSV file in one chunked pass.")
+parser.add_argument('file', nargs='?', default=RAW_DATA_PATH, help="CSV file to profile")
+parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows read at a time")
+parser.add_argument('--output', default=None, help="Profile to write (default: <file>.profile.json)")
+args = parser.parse_args()
+
+# Column types, nulls, ranges, approximate distinct counts and top values, without loading the file
+profile = profile_file(args.file, args.chunk_size)
+output = args.output or profile_path(args.file)
+write_profile(profile, output)
+
+print(f"{profile['rows']} rows, {len(profile['columns'])} columns")
+print(profile_table(profile).to_string(index=False))
+print(f"Profile saved to {output}.")
@@ -1,18 +1,26 @@
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import streamlit as st
 
-# Load the dataset
-file_path = "cleaned_healthcare_data.csv"  # Update with the correct path if necessary
-data = pd.read_csv(file_path)
+import analytics
+from data_store import store_version
+from timeseries import GRANULARITIES, daily_series, over_time
 
-# Ensure correct data types for date columns
-data['Date of Admission'] = pd.to_datetime(data['Date of Admission'])
-data['Discharge Date'] = pd.to_datetime(data['Discharge Date'])
+# Load the dataset (includes Length of Stay (Days))
+columns = ['Age', 'Gender', 'Medical Condition', 'Date of Admission', 'Discharge Date', 'Medication']
+data = analytics.load_data(columns=columns)
 
-# Add a new column for length of stay
-data['Length of Stay (Days)'] = (data['Discharge Date'] - data['Date of Admission']).dt.days
+# Sparse condition x medication counts and their totals, computed once per store version
+@st.cache_data(max_entries=4)
+def medication_condition_crosstab(version):
+    crosstab = analytics.medication_condition_crosstab(data)
+    return (crosstab, analytics.crosstab_totals(crosstab, 'Medical Condition'),
+            analytics.crosstab_totals(crosstab, 'Medication'))
+
+# Admissions and length-of-stay totals per day, rolled up to the selected granularity
+@st.cache_data(max_entries=4)
+def daily_admissions(version):
+    return daily_series(data)
 
 # Streamlit UI
 st.title("Healthcare Data Insights Dashboard")
@@ -32,7 +40,9 @@ analysis_option = st.sidebar.selectbox(
 if analysis_option == "Age Distribution":
     st.header("Age Distribution of Patients")
     fig, ax = plt.subplots(figsize=(10, 6))
-    sns.histplot(data['Age'], bins=20, kde=True, color='skyblue', ax=ax)
+    age_counts, age_bins = analytics.age_histogram(data, bins=20)
+    sns.histplot(x=(age_bins[:-1] + age_bins[1:]) / 2, weights=age_counts, bins=len(age_counts),
+                 binrange=(age_bins[0], age_bins[-1]), kde=True, color='skyblue', ax=ax)
     ax.set_title('Age Distribution of Patients', fontsize=16)
     ax.set_xlabel('Age', fontsize=12)
     ax.set_ylabel('Frequency', fontsize=12)
@@ -41,37 +51,47 @@ if analysis_option == "Age Distribution":
 # Gender Distribution
 elif analysis_option == "Gender Distribution":
     st.header("Gender Distribution")
-    gender_counts = data['Gender'].value_counts()
+    gender_counts = analytics.gender_counts(data)
     st.bar_chart(gender_counts)
 
 # Common Medical Conditions
 elif analysis_option == "Top Medical Conditions":
     st.header("Top 10 Medical Conditions")
-    condition_counts = data['Medical Condition'].value_counts().head(10)
+    condition_counts = analytics.top_conditions(data, n=10)
     st.bar_chart(condition_counts)
 
 # Timeline Analysis
 elif analysis_option == "Timeline Analysis":
     st.header("Timeline Analysis")
-    # Monthly admissions
-    monthly_admissions = data['Date of Admission'].dt.to_period('M').value_counts().sort_index()
+    granularity = st.selectbox("Granularity", GRANULARITIES, index=GRANULARITIES.index('Month'))
+    window = st.number_input("Rolling average over buckets", 1, 52, 1)
+    series = over_time(daily_admissions(store_version()), granularity, window)
+
+    # Admissions per bucket
     st.subheader("Admissions Over Time")
-    st.line_chart(monthly_admissions)
+    st.line_chart(series['admissions'])
 
     # Average length of stay over time
-    avg_length_stay = data.groupby(data['Date of Admission'].dt.to_period('M'))['Length of Stay (Days)'].mean()
     st.subheader("Average Length of Stay Over Time")
-    st.line_chart(avg_length_stay)
+    st.line_chart(series['avg los'])
 
 # Treatment Analysis
 elif analysis_option == "Treatment Analysis":
     st.header("Treatment Analysis")
     # Most common medications
     st.subheader("Most Common Medications")
-    medication_counts = data['Medication'].value_counts().head(10)
+    medication_counts = analytics.top_medications(data, n=10)
     st.bar_chart(medication_counts)
 
-    # Medications vs. Medical Conditions
+    # Medications vs. Medical Conditions: the top conditions against one page of medications
     st.subheader("Medications by Medical Condition")
-    medication_condition = data.groupby('Medical Condition')['Medication'].value_counts().unstack().fillna(0)
-    st.dataframe(medication_condition.style.background_gradient(cmap="viridis"))
+    crosstab, condition_totals, medication_totals = medication_condition_crosstab(store_version())
+    col1, col2, col3 = st.columns(3)
+    n_conditions = col1.number_input("Top conditions", 1, len(condition_totals), min(10, len(condition_totals)))
+    page_size = col2.number_input("Medications per page", 1, len(medication_totals), min(10, len(medication_totals)))
+    pages = -(-len(medication_totals) // page_size)
+    page = col3.number_input(f"Page (of {pages})", 1, pages, 1)
+    medications = medication_totals.index[(page - 1) * page_size:page * page_size]
+    visible = analytics.crosstab_slice(crosstab, condition_totals.index[:n_conditions], medications)
+    # Only the visible cells are styled; the color scale spans every count so pages compare
+    st.dataframe(visible.style.background_gradient(cmap="viridis", vmin=0, vmax=crosstab['count'].max()))
@@ -1,265 +1,660 @@
+import os
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
-from wordcloud import WordCloud
+
+# plotly.express and wordcloud (which pulls in matplotlib) are slow to import, so the views
+# that need them import them when first rendered; the Overview page loads neither.
+
+from data_profile import load_profile, profile_path, profile_table
+from data_store import CLEANED_STORE_PATH, RAW_DATA_PATH, compact_frame, load_cleaned, store_version
+from plot_summaries import box_figure, histogram_figure
+from profiling import span, start_tracing, stop_tracing
+from quantiles import (DIMENSIONS, MEASURES, QUANTILES, RELATIVE_ACCURACY, build_sketches, load_sketches, quantile_label,
+                       sketch_quantiles)
+from query_index import FilterIndex
+from readmissions import READMISSION_WINDOW, PatientIndex, readmission_rates
+from rollups import ROLLUP_PATH, build_rollup, load_rollup, rollup_counts, rollup_mean
+from sampling import PREVIEW_ROWS, Preview, with_error
+from timeseries import GRANULARITIES, daily_series, over_time
+from uploads import (REQUIRED_COLUMNS, cache_paths, clean_dashboard_data, content_hash, process_upload,
+                     upload_profile_path, upload_quantile_path, validate_upload)
+
+# Columns the sidebar can filter on: ranges are binary-searched, categories are kept as bitmaps
+FILTER_RANGE_COLUMNS = ["Date of Admission", "Age"]
+FILTER_CATEGORY_COLUMNS = ["Gender", "Medical Condition", "Admission Type", "Hospital"]
 
 # Set page config as the first Streamlit command
 st.set_page_config(page_title="Healthcare Data Insights Dashboard", layout="wide")
 
+# Opt-in timing spans for this rerun, switched on from the debug panel at the bottom of the sidebar
+if st.session_state.get('debug_timing'):
+    start_tracing(memory=st.session_state.get('debug_memory', False))
+else:
+    stop_tracing()
+
 # Function to clean and validate the uploaded data
-@st.cache_data
 def clean_data(data):
     try:
-        # Ensure necessary columns exist
-        required_columns = ["Date of Admission", "Discharge Date", "Age", "Gender", "Medical Condition", "Medication"]
-        for col in required_columns:
-            if col not in data.columns:
-                raise ValueError(f"Missing required column: {col}")
-        
-        # Convert dates to datetime
-        data['Date of Admission'] = pd.to_datetime(data['Date of Admission'], errors='coerce')
-        data['Discharge Date'] = pd.to_datetime(data['Discharge Date'], errors='coerce')
-
-        # Drop rows with invalid dates
-        data = data.dropna(subset=['Date of Admission', 'Discharge Date'])
-
-        # Calculate Length of Stay
-        data['Length of Stay (Days)'] = (data['Discharge Date'] - data['Date of Admission']).dt.days
-
-        # Ensure non-negative Length of Stay
-        data = data[data['Length of Stay (Days)'] >= 0]
-
-        # Clean other columns (e.g., remove empty values, normalize text)
-        data['Medical Condition'] = data['Medical Condition'].fillna("Unknown").str.strip()
-        data['Medication'] = data['Medication'].fillna("Unknown").str.strip()
-
-        return data
+        # Work on a shallow copy so the caller's frame is left untouched
+        data = clean_dashboard_data(data.copy(deep=False))
+
+        # Dictionary-encode repetitive text and narrow the numeric columns
+        return compact_frame(data)
     except Exception as e:
         st.error(f"Error while cleaning data: {e}")
         return None
 
-# Load data (from upload or default)
+# Word cloud image (memoized by the Medical Conditions view)
+def render_wordcloud(frequencies, width=800, height=400, background_color='white'):
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(width=width, height=height, background_color=background_color)
+    return wordcloud.generate_from_frequencies(frequencies).to_array()
+
+# Version of the default dataset: changes whenever the store, one of its batches or the rollup is rewritten
+def default_dataset_version():
+    rollup_version = os.stat(ROLLUP_PATH).st_mtime_ns if os.path.exists(ROLLUP_PATH) else None
+    return store_version(), rollup_version
+
+# Datasets are cached as resources: one copy per process, shared by every session without copying,
+# so the views must treat `data`, `rollup` and `sketches` as read-only.
+# Only the current version of the default dataset is kept; a rewritten store replaces the old copy.
+@st.cache_resource(max_entries=1)
+def load_default_dataset(dataset_version):
+    # Uses the rollup and quantile sketches built by Data_Clening.py / ingest.py when available
+    with span("load_cleaned"):
+        data = load_cleaned(columns=BASE_COLUMNS)
+    with span("clean_data"):
+        data = clean_data(data)
+    with span("rollup"):
+        rollup = load_rollup()
+        if rollup is None and data is not None:
+            rollup = build_rollup(data)
+    with span("quantile sketches"):
+        sketches = load_sketches()
+        if sketches is None and data is not None:
+            sketches = build_sketches(data)
+    return data, rollup, sketches
+
+# Uploads are parsed by a background worker, shared by every session of this process
+@st.cache_resource
+def upload_worker():
+    return ThreadPoolExecutor(max_workers=2)
+
+# Full-data aggregations behind a sampled preview run on their own worker, shared likewise
+@st.cache_resource
+def aggregation_worker():
+    return ThreadPoolExecutor(max_workers=2)
+
+# Upload jobs by uploaded file id: the worker's future and the fraction of the file read so far
+@st.cache_resource
+def upload_jobs():
+    return {}
+
+def process_in_background(uploaded_file):
+    # Runs on the worker: hash the file, then parse and clean it into the upload cache unless cached
+    job = upload_jobs()[uploaded_file.file_id]
+    digest = content_hash(uploaded_file)
+    process_upload(uploaded_file, digest, progress=lambda fraction: job.update(progress=fraction))
+    return digest
+
+# Cleaned upload, cached per file content and read back from the columnar upload cache
+@st.cache_resource(max_entries=4)
+def load_uploaded_dataset(digest):
+    store_path, rollup_path = cache_paths(digest)
+    with span("load_cleaned"):
+        data = load_cleaned(columns=BASE_COLUMNS, path=store_path)
+    with span("compact_frame"):
+        data = compact_frame(data)
+    # Uploads cached before quantile sketches were kept get them built from their rows
+    sketches = load_sketches(upload_quantile_path(digest))
+    return data, load_rollup(rollup_path), sketches if sketches is not None else build_sketches(data)
+
+# Validate a new upload up front, then hand it to the worker; returns its digest once processed
+def process_uploaded_file(uploaded_file):
+    jobs = upload_jobs()
+    if uploaded_file.file_id not in jobs:
+        # Fail fast on the header and a sample instead of after a full parse
+        validate_upload(uploaded_file)
+        jobs[uploaded_file.file_id] = {'progress': 0.0}
+        jobs[uploaded_file.file_id]['future'] = upload_worker().submit(process_in_background, uploaded_file)
+
+    job = jobs[uploaded_file.file_id]
+    if not job['future'].done():
+        st.sidebar.progress(job['progress'], text="Parsing and cleaning the uploaded file...")
+        st.info("The uploaded file is being processed; the dashboard will appear when it is ready.")
+        time.sleep(0.5)
+        st.rerun()
+    return job['future'].result()
+
+# Load data (from upload or default), together with its rollup, its quantile sketches, a version
+# identifying it, the store it was read from and the profile of its raw file (None if it hasn't
+# been profiled)
 def load_data():
     uploaded_file = st.sidebar.file_uploader("Upload CSV File", type=["csv"])
     if uploaded_file is not None:
         try:
-            data = pd.read_csv(uploaded_file)
-            data = clean_data(data)
-            if data is not None:
-                st.sidebar.success("File uploaded and cleaned successfully!")
-                return data
+            digest = process_uploaded_file(uploaded_file)
+            data, rollup, sketches = load_uploaded_dataset(digest)
+            st.sidebar.success("File uploaded and cleaned successfully!")
+            return data, rollup, sketches, digest, cache_paths(digest)[0], load_profile(upload_profile_path(digest))
         except Exception as e:
             st.sidebar.error(f"Error reading uploaded file: {e}")
+        return None, None, None, None, None, None
     else:
         # Fallback to default dataset
-        file_path = "cleaned_healthcare_data.csv"
-        data = pd.read_csv(file_path)
-        data = clean_data(data)
-        return data
-
-# Load the dataset
-data = load_data()
-
-# Streamlit UI
-st.title("Healthcare Data Insights Dashboard")
-
-# Sidebar
-st.sidebar.title("Analysis Options")
-analysis_option = st.sidebar.selectbox(
-    "Select Analysis",
-    [
-        "Overview",
-        "Patient Demographics", 
-        "Medical Conditions", 
-        "Timeline Analysis", 
-        "Treatment Analysis",
-        "Length of Stay Analysis"
-    ]
-)
-
-# Ensure data is loaded before proceeding
-if data is not None:
-    # Insert the rest of your analysis code here, as in your provided example
-    # For brevity, I'll use placeholders below:
-    if analysis_option == "Overview":
-        st.header("Overview of Healthcare Data")
-        # Overview analysis code...
-
-    elif analysis_option == "Patient Demographics":
-        st.header("Patient Demographics")
-        # Patient demographics analysis code...
-
-    elif analysis_option == "Medical Conditions":
-        st.header("Medical Conditions Analysis")
-        # Medical conditions analysis code...
-
-    elif analysis_option == "Timeline Analysis":
-        st.header("Timeline Analysis")
-        # Timeline analysis code...
-
-    elif analysis_option == "Treatment Analysis":
-        st.header("Treatment Analysis")
-        # Treatment analysis code...
-
-    elif analysis_option == "Length of Stay Analysis":
-        st.header("Length of Stay Analysis")
-        # Length of Stay analysis code...
-else:
-    st.warning("No valid data available for analysis. Please upload a CSV file.")
-
+        if st.sidebar.button("Reload dataset"):
+            load_default_dataset.clear()
+        dataset_version = default_dataset_version()
+        data, rollup, sketches = load_default_dataset(dataset_version)
+        return (data, rollup, sketches, dataset_version, CLEANED_STORE_PATH,
+                load_profile(profile_path(RAW_DATA_PATH), source=RAW_DATA_PATH))
+
+# Filter index, built once per dataset version and shared like the dataset itself
+@st.cache_resource(max_entries=4)
+def get_filter_index(dataset_version, _data):
+    with span("build filter index"):
+        return FilterIndex(
+            _data,
+            [col for col in FILTER_RANGE_COLUMNS if col in _data.columns],
+            [col for col in FILTER_CATEGORY_COLUMNS if col in _data.columns],
+        )
+
+# Patient index (rows sorted by patient and admission date), built once per dataset version and filter set
+@st.cache_resource(max_entries=4)
+def get_patient_index(dataset_version, _data):
+    with span("build patient index"):
+        return PatientIndex(_data)
+
+# Rows, rollup, quantile sketches and daily series matching a set of filters (all rows without
+# filters). The daily series holds admissions and length-of-stay totals per day; every granularity
+# and rolling average of the time views is rolled up from it.
+def aggregate_dataset(data, rollup, sketches, index, filters):
+    if any(filters):
+        ranges, categories = filters
+        with span("filter rows"):
+            data = data.take(index.select(dict(ranges), dict(categories)))
+        with span("filter rollup"):
+            rollup = build_rollup(data)
+        with span("filter quantile sketches"):
+            sketches = build_sketches(data)
+    with span("daily series"):
+        return data, rollup, sketches, daily_series(data)
+
+# aggregate_dataset, cached per dataset version and filter values
+@st.cache_resource(max_entries=8)
+def full_dataset(dataset_version, filters, _data, _rollup, _sketches, _index):
+    return aggregate_dataset(_data, _rollup, _sketches, _index, filters)
+
+# aggregate_dataset run on the background worker, for the progressive preview: a future, cached likewise
+@st.cache_resource(max_entries=8)
+def full_dataset_job(dataset_version, filters, _data, _rollup, _sketches, _index):
+    return aggregation_worker().submit(aggregate_dataset, _data, _rollup, _sketches, _index, filters)
+
+# Stratified sample of the dataset, drawn once per dataset version and filtered like the full rows;
+# None when no sampled row matches the filters
+@st.cache_resource(max_entries=8)
+def get_preview(dataset_version, filters, _data):
+    if not any(filters):
+        with span("preview sample"):
+            return Preview.sample(_data)
+    sample = get_preview(dataset_version, ((), ()), _data)
+    ranges, categories = filters
+    positions = get_filter_index((dataset_version, "preview"), sample.data).select(dict(ranges), dict(categories))
+    return sample.subset(positions) if len(positions) else None
+
+# Sidebar filters as a hashable (ranges, categories) pair; unchanged widgets add no filter
+def sidebar_filters(index):
+    st.sidebar.title("Filters")
+    ranges, categories = [], []
+
+    # A range with a single value (or none) has nothing to narrow, so it gets no widget
+    dates = index.bounds("Date of Admission") if "Date of Admission" in index.ranges else None
+    if dates is not None:
+        first, last = (pd.Timestamp(value).date() for value in dates)
+    if dates is not None and first < last:
+        selected = st.sidebar.date_input("Date of Admission", (first, last), min_value=first, max_value=last)
+        if len(selected) == 2 and tuple(selected) != (first, last):
+            # Include the whole last day
+            end = pd.Timestamp(selected[1]) + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+            ranges.append(("Date of Admission", (pd.Timestamp(selected[0]), end)))
+
+    ages = index.bounds("Age") if "Age" in index.ranges else None
+    if ages is not None:
+        youngest, oldest = math.floor(ages[0]), math.ceil(ages[1])
+    if ages is not None and youngest < oldest:
+        selected = st.sidebar.slider("Age", youngest, oldest, (youngest, oldest))
+        if selected != (youngest, oldest):
+            ranges.append(("Age", selected))
+
+    for col in index.categories:
+        # An empty selection keeps every value
+        selected = st.sidebar.multiselect(col, index.values(col))
+        if selected:
+            categories.append((col, tuple(selected)))
+
+    return tuple(ranges), tuple(categories)
+
+# Columns a view declares beyond the loaded ones, read from the store on demand for every loaded row
+# and cached per dataset version and column set. Loaded rows keep their position in the store as
+# their label (cleaning only drops rows), so filtered and sampled rows find theirs by label too.
+@st.cache_resource(max_entries=8)
+def load_view_columns(dataset_version, store_path, columns, _data):
+    with span("load view columns"):
+        extra = load_cleaned(columns=list(columns), path=store_path)
+        extra = compact_frame(extra.take(_data.index.to_numpy()))
+    extra.index = _data.index
+    return extra
+
+# A view's declared columns of the current (possibly filtered or sampled) rows, cached per
+# rows version and column set
+@st.cache_resource(max_entries=8)
+def view_frame(dataset_version, columns, _data, _extra):
+    frame = _data[[col for col in columns if col in _data.columns]]
+    if _extra is not None and len(_extra.columns):
+        extra = _extra if _extra.index.equals(frame.index) else _extra.loc[frame.index]
+        frame = pd.concat([frame, extra], axis=1)
+    return frame
+
+# Per-view results, memoized on the dataset version, the view, the result and its widget parameters
+# (the compute function isn't hashed), so revisiting a tab with the same settings is a cache hit
+@st.cache_data(max_entries=128, show_spinner=False)
+def view_result(dataset_version, view, key, params, _compute):
+    with span(key):
+        return _compute(*params)
+
+# Send a figure to the browser (its serialization is timed as the chart render). Keyed by the view
+# and the chart's title, since two charts of a view can have identical figures (e.g. when filtered
+# to a single condition) and Streamlit rejects duplicate elements without a key
+def show_chart(fig, title):
+    with span("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True, key=f"{analysis_option}: {title}")
 
 # Overview
-if analysis_option == "Overview":
-    
-    
+def overview_view(data, rollup, memo):
+    st.header("Overview of Healthcare Data")
+
+    total, avg_age, avg_stay, conditions = memo("metrics", lambda: (
+        int(rollup['count'].sum()),
+        rollup_mean(rollup, 'Age'),
+        rollup_mean(rollup, 'Length of Stay (Days)'),
+        rollup['Medical Condition'].nunique(),
+    ))
+    total_error, age_error, stay_error = memo("metric_errors", lambda: (
+        preview.count_errors(),
+        preview.mean_errors('Age'),
+        preview.mean_errors('Length of Stay (Days)'),
+    )) if preview is not None else (None, None, None)
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Patients", len(data))
-    col2.metric("Avg Age", f"{data['Age'].mean():.1f}")
-    col3.metric("Avg Length of Stay", f"{data['Length of Stay (Days)'].mean():.1f} days")
-    col4.metric("Unique Conditions", data['Medical Condition'].nunique())
-    
+    col1.metric("Total Patients", with_error(total, total_error, '{:,.0f}'))
+    col2.metric("Avg Age", with_error(avg_age, age_error))
+    col3.metric("Avg Length of Stay", f"{with_error(avg_stay, stay_error)} days")
+    col4.metric("Unique Conditions", conditions)
+
     st.subheader("Quick Insights")
-    fig = go.Figure()
-    fig.add_trace(go.Box(y=data['Age'], name="Age Distribution"))
-    fig.add_trace(go.Box(y=data['Length of Stay (Days)'], name="Length of Stay Distribution"))
-    fig.update_layout(title="Age and Length of Stay Distributions", height=500)
-    st.plotly_chart(fig, use_container_width=True)
+    def distributions(prebinned):
+        fig = box_figure({
+            "Age Distribution": data['Age'],
+            "Length of Stay Distribution": data['Length of Stay (Days)'],
+        }, prebinned)
+        fig.update_layout(title="Age and Length of Stay Distributions", height=500)
+        return fig
+    show_chart(memo("distributions", distributions, prebinned), "Age and Length of Stay Distributions")
 
 # Patient Demographics
-elif analysis_option == "Patient Demographics":
-    
-    
+def demographics_view(data, rollup, memo):
+    import plotly.express as px
+
+    st.header("Patient Demographics")
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
         st.subheader("Age Distribution")
-        fig = px.histogram(data, x='Age', nbins=20, marginal='box')
-        fig.update_layout(bargap=0.1)
-        st.plotly_chart(fig, use_container_width=True)
-    
+        def age_histogram(prebinned):
+            fig = histogram_figure(data['Age'], 20, 'Age', prebinned, preview_weights())
+            fig.update_layout(bargap=0.1)
+            return fig
+        show_chart(memo("age_histogram", age_histogram, prebinned), "Age Distribution")
+
     with col2:
         st.subheader("Gender Distribution")
-        fig = px.pie(data, names='Gender', hole=0.3)
-        st.plotly_chart(fig, use_container_width=True)
-    
+        gender_counts = memo("gender_counts", lambda: rollup_counts(rollup, 'Gender'))
+        fig = px.pie(names=gender_counts.index, values=gender_counts.values, hole=0.3)
+        show_chart(fig, "Gender Distribution")
+
     st.subheader("Age Distribution by Gender")
-    fig = px.box(data, x='Gender', y='Age', color='Gender')
-    st.plotly_chart(fig, use_container_width=True)
+    def age_by_gender(prebinned):
+        fig = box_figure(dict(tuple(data.groupby('Gender', observed=True)['Age'])), prebinned)
+        fig.update_layout(xaxis_title="Gender", yaxis_title="Age")
+        return fig
+    show_chart(memo("age_by_gender", age_by_gender, prebinned), "Age Distribution by Gender")
 
 # Medical Conditions
-elif analysis_option == "Medical Conditions":
-    
-    
+def conditions_view(data, rollup, memo):
+    import plotly.express as px
+
+    st.header("Medical Conditions Analysis")
+
     top_n = st.slider("Select number of top conditions to display", 5, 20, 10)
-    
+    condition_counts = memo("condition_counts", lambda: rollup_counts(rollup, 'Medical Condition'))
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
         st.subheader(f"Top {top_n} Medical Conditions")
-        condition_counts = data['Medical Condition'].value_counts().head(top_n)
-        fig = px.bar(x=condition_counts.index, y=condition_counts.values)
+        top_conditions = condition_counts.head(top_n)
+        fig = px.bar(x=top_conditions.index, y=top_conditions.values,
+                     error_y=count_errors(memo, top_conditions.index, 'Medical Condition'))
         fig.update_layout(xaxis_title="Medical Condition", yaxis_title="Count")
-        st.plotly_chart(fig, use_container_width=True)
-    
+        show_chart(fig, "Top Medical Conditions")
+
     with col2:
         st.subheader("Word Cloud of Medical Conditions")
-        wordcloud = WordCloud(width=800, height=400, background_color='white').generate(' '.join(data['Medical Condition']))
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.imshow(wordcloud, interpolation='bilinear')
-        ax.axis('off')
-        st.pyplot(fig)
+        image = memo("wordcloud", lambda: render_wordcloud(condition_counts.to_dict()))
+        st.image(image, use_container_width=True)
 
 # Timeline Analysis
-elif analysis_option == "Timeline Analysis":
-    
-    
-    # Monthly admissions
-    monthly_admissions = data['Date of Admission'].dt.to_period('M').value_counts().sort_index()
-    monthly_admissions.index = monthly_admissions.index.astype(str)
-    
+def timeline_view(data, rollup, memo):
+    import plotly.express as px
+
+    st.header("Timeline Analysis")
+    granularity, window = time_controls()
+    series = memo("series", time_series, granularity, window)
+
     st.subheader("Admissions Over Time")
-    fig = px.line(x=monthly_admissions.index, y=monthly_admissions.values)
-    fig.update_layout(xaxis_title="Month", yaxis_title="Number of Admissions")
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Average length of stay over time
-    avg_length_stay = data.groupby(data['Date of Admission'].dt.to_period('M'))['Length of Stay (Days)'].mean()
-    avg_length_stay.index = avg_length_stay.index.astype(str)
-    
+    fig = px.line(x=series.index, y=series['admissions'], error_y=series.get('admissions error'))
+    fig.update_layout(xaxis_title=granularity, yaxis_title="Number of Admissions")
+    show_chart(fig, "Admissions Over Time")
+
     st.subheader("Average Length of Stay Over Time")
-    fig = px.line(x=avg_length_stay.index, y=avg_length_stay.values)
-    fig.update_layout(xaxis_title="Month", yaxis_title="Average Length of Stay (Days)")
-    st.plotly_chart(fig, use_container_width=True)
+    fig = px.line(x=series.index, y=series['avg los'], error_y=series.get('avg los error'))
+    fig.update_layout(xaxis_title=granularity, yaxis_title="Average Length of Stay (Days)")
+    show_chart(fig, "Average Length of Stay Over Time")
 
 # Treatment Analysis
-# Treatment Analysis
-elif analysis_option == "Treatment Analysis":
-    
-    
+def treatment_view(data, rollup, memo):
+    import plotly.express as px
+
+    st.header("Treatment Analysis")
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
         st.subheader("Most Common Medications")
-        medication_counts = data['Medication'].value_counts().head(10)
-        fig = px.bar(x=medication_counts.index, y=medication_counts.values)
+        medication_counts = memo("medication_counts", lambda: rollup_counts(rollup, 'Medication').head(10))
+        fig = px.bar(x=medication_counts.index, y=medication_counts.values,
+                     error_y=count_errors(memo, medication_counts.index, 'Medication'))
         fig.update_layout(xaxis_title="Medication", yaxis_title="Count")
-        st.plotly_chart(fig, use_container_width=True)
-    
+        show_chart(fig, "Most Common Medications")
+
     with col2:
         st.subheader("Treatment Effectiveness")
         if 'Treatment Outcome' in data.columns:
-            treatment_effectiveness = data.groupby('Medication')['Treatment Outcome'].value_counts(normalize=True).unstack()
+            treatment_effectiveness = memo("treatment_effectiveness", lambda: data.groupby(
+                'Medication', observed=True)['Treatment Outcome'].value_counts(normalize=True).unstack())
             fig = px.bar(treatment_effectiveness, barmode='stack')
             fig.update_layout(xaxis_title="Medication", yaxis_title="Proportion of Outcomes")
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig, "Treatment Effectiveness")
         else:
             st.write("Column 'Treatment Outcome' not found in the data.")
-    
+
     st.subheader("Medications by Medical Condition")
-    selected_condition = st.selectbox("Select a Medical Condition", data['Medical Condition'].unique())
-    condition_data = data[data['Medical Condition'] == selected_condition]
-    medication_counts = condition_data['Medication'].value_counts().head(10)
-    fig = px.bar(x=medication_counts.index, y=medication_counts.values)
+    conditions = memo("conditions", lambda: list(rollup['Medical Condition'].unique()))
+    selected_condition = st.selectbox("Select a Medical Condition", conditions)
+    medication_counts = memo("condition_medication_counts", lambda condition: rollup_counts(
+        rollup[rollup['Medical Condition'] == condition], 'Medication').head(10), selected_condition)
+    fig = px.bar(x=medication_counts.index, y=medication_counts.values, error_y=count_errors(
+        memo, medication_counts.index, 'Medication', condition=selected_condition))
     fig.update_layout(xaxis_title="Medication", yaxis_title="Count")
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig, "Medications by Medical Condition")
+
+    st.subheader("Billing Amount Quantiles")
+    quantile_chart(memo, 'Billing Amount', "Billing Amount (USD)")
 
-    #Length of Stay Analysis
-elif analysis_option == "Length of Stay Analysis":
-    
+# Length of Stay Analysis
+def length_of_stay_view(data, rollup, memo):
+    import plotly.express as px
+
+    st.header("Length of Stay Analysis")
 
     # Distribution of Length of Stay
     st.subheader("Distribution of Length of Stay")
-    fig = px.histogram(data, x='Length of Stay (Days)', nbins=50, marginal='box')
-    fig.update_layout(bargap=0.1)
-    st.plotly_chart(fig, use_container_width=True)
+    def los_histogram(prebinned):
+        fig = histogram_figure(data['Length of Stay (Days)'], 50, 'Length of Stay (Days)', prebinned, preview_weights())
+        fig.update_layout(bargap=0.1)
+        return fig
+    show_chart(memo("los_histogram", los_histogram, prebinned), "Distribution of Length of Stay")
 
     # Average Length of Stay by Medical Condition
     st.subheader("Average Length of Stay by Medical Condition")
-    avg_length_stay_by_condition = data.groupby('Medical Condition')['Length of Stay (Days)'].mean().reset_index()
+    avg_length_stay_by_condition = memo("avg_los_by_condition", lambda: rollup_mean(
+        rollup, 'Length of Stay (Days)', by='Medical Condition').rename('Length of Stay (Days)').reset_index())
     fig = px.bar(x=avg_length_stay_by_condition['Medical Condition'], y=avg_length_stay_by_condition['Length of Stay (Days)'], 
+                 error_y=mean_errors(memo, avg_length_stay_by_condition['Medical Condition'], 'Length of Stay (Days)', 'Medical Condition'),
                  title="Average Length of Stay by Medical Condition")
     fig.update_layout(xaxis_title="Medical Condition", yaxis_title="Average Length of Stay (Days)")
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig, "Average Length of Stay by Medical Condition")
+
+    # Median and tail Length of Stay per group
+    st.subheader("Length of Stay Quantiles")
+    quantile_chart(memo, 'Length of Stay (Days)', "Length of Stay (Days)")
 
     # Length of Stay Over Time
     st.subheader("Length of Stay Over Time")
-    avg_length_stay_over_time = data.groupby(data['Date of Admission'].dt.to_period('M'))['Length of Stay (Days)'].mean()
-    avg_length_stay_over_time.index = avg_length_stay_over_time.index.astype(str)
-    fig = px.line(x=avg_length_stay_over_time.index, y=avg_length_stay_over_time.values, 
+    granularity, window = time_controls()
+    series = memo("series", time_series, granularity, window)
+    fig = px.line(x=series.index, y=series['avg los'], error_y=series.get('avg los error'),
                   title="Average Length of Stay Over Time")
-    fig.update_layout(xaxis_title="Month", yaxis_title="Average Length of Stay (Days)")
-    st.plotly_chart(fig, use_container_width=True)
+    fig.update_layout(xaxis_title=granularity, yaxis_title="Average Length of Stay (Days)")
+    show_chart(fig, "Length of Stay Over Time")
 
     # Top 10 Conditions with Longest Average Length of Stay
     st.subheader("Top 10 Conditions with Longest Average Length of Stay")
     top_conditions = avg_length_stay_by_condition.nlargest(10, 'Length of Stay (Days)')
     fig = px.bar(x=top_conditions['Medical Condition'], y=top_conditions['Length of Stay (Days)'], 
+                 error_y=mean_errors(memo, top_conditions['Medical Condition'], 'Length of Stay (Days)', 'Medical Condition'),
                  title="Top 10 Conditions with Longest Average Length of Stay")
     fig.update_layout(xaxis_title="Medical Condition", yaxis_title="Average Length of Stay (Days)")
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig, "Top 10 Conditions with Longest Average Length of Stay")
+
+# Readmission Analysis
+def readmission_view(data, rollup, memo):
+    import plotly.express as px
+
+    st.header("Readmission Analysis")
+    if preview is not None:
+        st.info("Readmissions link every stay of a patient, so they are shown once the full data is ready.")
+        return
+    missing = [col for col in ['Name', 'Age', 'Gender'] if col not in data.columns]
+    if missing:
+        st.write(f"Column(s) {', '.join(missing)} not found in the data.")
+        return
+
+    index = get_patient_index(dataset_version, data)
+    window = st.slider("Readmission window (days after discharge)", 1, 90, READMISSION_WINDOW)
+    readmitted = memo("readmitted", index.readmitted, window)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Stays", f"{len(readmitted):,}")
+    col2.metric("Readmissions", f"{readmitted.sum():,}")
+    col3.metric("Readmission Rate", f"{readmitted.mean():.2%}")
+
+    st.subheader("Readmission Rate by Medical Condition")
+    by_condition = memo("by_condition", lambda window: readmission_rates(
+        data, readmitted, 'Medical Condition').sort_values('rate', ascending=False), window)
+    fig = px.bar(x=by_condition.index, y=by_condition['rate'] * 100)
+    fig.update_layout(xaxis_title="Medical Condition", yaxis_title="Readmitted Stays (%)")
+    show_chart(fig, "Readmission Rate by Medical Condition")
+
+    if 'Hospital' in data.columns:
+        st.subheader("Readmission Rate by Hospital")
+        top_n = st.slider("Number of hospitals (most stays first)", 5, 30, 10)
+        by_hospital = memo("by_hospital", lambda window, top_n: readmission_rates(
+            data, readmitted, 'Hospital').nlargest(top_n, 'stays'), window, top_n)
+        fig = px.bar(x=by_hospital.index, y=by_hospital['rate'] * 100)
+        fig.update_layout(xaxis_title="Hospital", yaxis_title="Readmitted Stays (%)")
+        show_chart(fig, "Readmission Rate by Hospital")
+
+    st.subheader("Readmitted Patients")
+    readmissions = memo("readmissions", lambda window: index.readmissions(data, window), window)
+    st.dataframe(readmissions.head(1000), hide_index=True, use_container_width=True)
+    if len(readmissions) > 1000:
+        st.caption(f"First 1,000 of {len(readmissions):,} readmissions.")
+
+# Data Profile: the raw file's one-pass profile, read instead of rescanning the data
+def profile_view(data, rollup, memo):
+    st.header("Data Profile")
+    if profile is None:
+        st.info("This dataset has no profile yet. Run `python analyze_healthcare_data.py` "
+                "(or `python Data_Clening.py`) to profile the default dataset.")
+        return
+
+    col1, col2 = st.columns(2)
+    col1.metric("Rows in File", f"{profile['rows']:,}")
+    col2.metric("Columns", len(profile['columns']))
+    st.dataframe(profile_table(profile), hide_index=True, use_container_width=True)
+    st.caption("Distinct counts are approximate (HyperLogLog); top values come from a bounded frequent-values summary.")
+
+# Time bucket size and rolling-average window (in buckets) of the time-series charts
+def time_controls():
+    col1, col2 = st.columns(2)
+    granularity = col1.selectbox("Granularity", GRANULARITIES, index=GRANULARITIES.index('Month'))
+    window = col2.number_input("Rolling average over buckets", 1, 52, 1,
+                               help="Smooth each point over the buckets up to it, to show seasonality")
+    return granularity, window
+
+# Admissions and average length of stay per time bucket, with 95% intervals while previewing
+def time_series(granularity, window):
+    if preview is not None:
+        return preview.over_time(granularity, window)
+    return over_time(daily, granularity, window)
+
+# Median, p90 and p99 of a measure per condition, hospital or month, read from the quantile
+# sketches (never from the rows), as a chart and a table; only the busiest hospitals are shown
+def quantile_chart(memo, measure, title, hospitals=20):
+    import plotly.express as px
+
+    dimension = st.selectbox("Group by", DIMENSIONS[1:], key=f"{measure} quantiles by")
+    table = memo(f"{measure} quantiles", lambda dimension: sketch_quantiles(sketches, measure, dimension), dimension)
+    if dimension == 'Hospital':
+        table = table.nlargest(hospitals, 'count')
+    columns = [quantile_label(q) for q in QUANTILES]
+    if dimension == 'Month':
+        fig = px.line(table, x=table.index, y=columns)
+    else:
+        fig = px.bar(table, x=table.index, y=columns, barmode='group')
+    fig.update_layout(xaxis_title=dimension, yaxis_title=title, legend_title="Quantile")
+    show_chart(fig, f"{measure} Quantiles")
+    st.dataframe(table.rename(columns={'count': 'Stays'}).round(1), use_container_width=True)
+    st.caption(f"Quantiles are read from mergeable sketches, within {RELATIVE_ACCURACY:.0%} of the exact values"
+               + (" of the weighted sample." if preview is not None else "."))
+
+# While previewing a sample: the rows each sampled row stands for, and the 95% interval
+# half-widths of counts or means per `by` group, aligned with `index`. None on the full data.
+def preview_weights():
+    return preview.weights if preview is not None else None
+
+def count_errors(memo, index, by, condition=None):
+    if preview is None:
+        return None
+    errors = memo(f"{by} count errors", lambda condition: preview.count_errors(
+        by, None if condition is None else preview.rollup['Medical Condition'] == condition), condition)
+    return errors.reindex(index).to_numpy()
+
+def mean_errors(memo, index, measure, by):
+    if preview is None:
+        return None
+    return memo(f"{by} {measure} errors", lambda: preview.mean_errors(measure, by)).reindex(index).to_numpy()
+
+# Analysis views: name -> (row-level columns the view reads, render function).
+# A view gets only the columns it declares, loading those that aren't loaded up front on its
+# first render; views that only read the aggregates declare no columns and get no rows.
+VIEWS = {
+    "Overview": (["Age", "Length of Stay (Days)"], overview_view),
+    "Patient Demographics": (["Age", "Gender"], demographics_view),
+    "Medical Conditions": ([], conditions_view),
+    "Timeline Analysis": ([], timeline_view),
+    "Treatment Analysis": (["Medication", "Treatment Outcome"], treatment_view),
+    "Length of Stay Analysis": (["Length of Stay (Days)"], length_of_stay_view),
+    "Readmission Analysis": (["Name", "Age", "Gender", "Medical Condition", "Hospital", "Date of Admission",
+                              "Discharge Date"], readmission_view),
+    "Data Profile": ([], profile_view),
+}
+
+# Columns loaded up front: those the cleaning and the sidebar filters need and those the rollup,
+# quantile sketches and daily series of filtered rows are built from (Length of Stay is derived
+# from the dates, so it is skipped if the store doesn't have it). Other columns a view declares
+# are read when the view is first shown (see load_view_columns).
+BASE_COLUMNS = list(dict.fromkeys(REQUIRED_COLUMNS + FILTER_RANGE_COLUMNS + FILTER_CATEGORY_COLUMNS + MEASURES))
+
+# Load the dataset
+with span("load"):
+    data, rollup, sketches, dataset_version, store_path, profile = load_data()
+
+# Streamlit UI
+st.title("Healthcare Data Insights Dashboard")
+
+# Sidebar
+st.sidebar.title("Analysis Options")
+analysis_option = st.sidebar.selectbox("Select Analysis", list(VIEWS))
+prebinned = st.sidebar.checkbox(
+    "Summarize distributions on the server", value=True,
+    help="Send histogram bins and box-plot statistics to the browser instead of every row"
+)
+progressive = st.sidebar.checkbox(
+    "Progressive preview", value=False,
+    help=f"On datasets over {PREVIEW_ROWS:,} rows, draw each view from a stratified sample first, with 95% "
+         "confidence intervals, and replace it with the full results once they are ready"
+)
+
+# Apply the sidebar filters to every view; in progressive mode, views are drawn from the
+# sample until the full aggregations finish in the background
+preview = None
+loaded_data, loaded_version = data, dataset_version
+if data is not None:
+    filter_index = get_filter_index(dataset_version, data)
+    filters = sidebar_filters(filter_index)
+    if progressive and len(data) > PREVIEW_ROWS:
+        job = full_dataset_job(dataset_version, filters, data, rollup, sketches, filter_index)
+        if not job.done():
+            preview = get_preview(dataset_version, filters, data)
+        if preview is None:
+            data, rollup, sketches, daily = job.result()
+    else:
+        data, rollup, sketches, daily = full_dataset(dataset_version, filters, data, rollup, sketches, filter_index)
+
+    if preview is not None:
+        data, rollup, sketches, daily = preview.data, preview.rollup, preview.sketches, preview.daily
+        dataset_version = (dataset_version, filters, "preview")
+        st.info(f"Preview from a stratified sample of {len(data):,} rows ({preview.fraction:.1%} of the dataset; "
+                "± is a 95% confidence interval). The full results will replace it when they are ready.")
+    elif any(filters):
+        dataset_version = (dataset_version, filters)
+        if data.empty:
+            st.warning("No records match the selected filters.")
+            st.stop()
+
+# Ensure data is loaded before proceeding, then run only the selected view
+if data is not None:
+    def memo(key, compute, *params):
+        # compute(*params), cached for this dataset version and view
+        return view_result(dataset_version, analysis_option, key, params, compute)
+
+    columns, render_view = VIEWS[analysis_option]
+    rows = None
+    if columns:
+        missing = tuple(col for col in columns if col not in loaded_data.columns)
+        extra = load_view_columns(loaded_version, store_path, missing, loaded_data) if missing else None
+        rows = view_frame(dataset_version, tuple(columns), data, extra)
+    with span(f"view: {analysis_option}"):
+        render_view(rows, rollup, memo)
+else:
+    st.warning("No valid data available for analysis. Please upload a CSV file.")
 
 
 st.markdown("---")  # Separator line
@@ -283,3 +678,20 @@ st.sidebar.markdown(
     [Freelancer.com](https://www.freelancer.com/u/salamomakouf1994) | [GitHub](https://github.com/SalamoXso) | [LinkedIn](https://www.linkedin.com/in/salamo-makouf-25b264189/)
     """
 )
+
+# Debug panel: per-rerun timing (and optionally memory) spans, with JSON / Chrome trace export
+with st.sidebar.expander("Debug"):
+    st.checkbox("Time each rerun", key='debug_timing')
+    st.checkbox("Trace memory (slower)", key='debug_memory')
+    tracer = stop_tracing()
+    if tracer is not None and tracer.spans:
+        st.dataframe(tracer.table(), hide_index=True)
+        st.download_button("Download spans (JSON)", tracer.to_json(), "dashboard_spans.json", "application/json")
+        st.download_button("Download Chrome trace", tracer.to_chrome_trace(), "dashboard_trace.json", "application/json")
+    elif st.session_state.get('debug_timing'):
+        st.caption("Spans appear here from the next rerun on.")
+
+# Check for the full results while a preview is shown; the preview stays on screen until they replace it
+if preview is not None:
+    time.sleep(0.5)
+    st.rerun()
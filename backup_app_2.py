@@ -1,23 +1,23 @@
 import streamlit as st
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
 from wordcloud import WordCloud
 
+import analytics
+
+# Columns used by the dashboard views
+DASHBOARD_COLUMNS = ["Date of Admission", "Discharge Date", "Age", "Gender", "Medical Condition", "Medication",
+                     "Treatment Outcome"]
+
 # Set page config as the first Streamlit command
 st.set_page_config(page_title="Healthcare Data Insights Dashboard", layout="wide")
 
 # Load the dataset
 @st.cache_data
 def load_data():
-    file_path = "cleaned_healthcare_data.csv"  # Update with the correct path if necessary
-    data = pd.read_csv(file_path)
-    data['Date of Admission'] = pd.to_datetime(data['Date of Admission'])
-    data['Discharge Date'] = pd.to_datetime(data['Discharge Date'])
-    data['Length of Stay (Days)'] = (data['Discharge Date'] - data['Date of Admission']).dt.days
-    return data
+    return analytics.load_data(columns=DASHBOARD_COLUMNS)
 
 data = load_data()
 
@@ -86,7 +86,7 @@ elif analysis_option == "Medical Conditions":
     
     with col1:
         st.subheader(f"Top {top_n} Medical Conditions")
-        condition_counts = data['Medical Condition'].value_counts().head(top_n)
+        condition_counts = analytics.top_conditions(data, n=top_n)
         fig = px.bar(x=condition_counts.index, y=condition_counts.values)
         fig.update_layout(xaxis_title="Medical Condition", yaxis_title="Count")
         st.plotly_chart(fig, use_container_width=True)
@@ -104,8 +104,7 @@ elif analysis_option == "Timeline Analysis":
     st.header("Timeline Analysis")
     
     # Monthly admissions
-    monthly_admissions = data['Date of Admission'].dt.to_period('M').value_counts().sort_index()
-    monthly_admissions.index = monthly_admissions.index.astype(str)
+    monthly_admissions = analytics.monthly_admissions(data)
     
     st.subheader("Admissions Over Time")
     fig = px.line(x=monthly_admissions.index, y=monthly_admissions.values)
@@ -113,8 +112,7 @@ elif analysis_option == "Timeline Analysis":
     st.plotly_chart(fig, use_container_width=True)
     
     # Average length of stay over time
-    avg_length_stay = data.groupby(data['Date of Admission'].dt.to_period('M'))['Length of Stay (Days)'].mean()
-    avg_length_stay.index = avg_length_stay.index.astype(str)
+    avg_length_stay = analytics.monthly_avg_los(data)
     
     st.subheader("Average Length of Stay Over Time")
     fig = px.line(x=avg_length_stay.index, y=avg_length_stay.values)
@@ -130,7 +128,7 @@ elif analysis_option == "Treatment Analysis":
     
     with col1:
         st.subheader("Most Common Medications")
-        medication_counts = data['Medication'].value_counts().head(10)
+        medication_counts = analytics.top_medications(data, n=10)
         fig = px.bar(x=medication_counts.index, y=medication_counts.values)
         fig.update_layout(xaxis_title="Medication", yaxis_title="Count")
         st.plotly_chart(fig, use_container_width=True)
@@ -138,7 +136,7 @@ elif analysis_option == "Treatment Analysis":
     with col2:
         st.subheader("Treatment Effectiveness")
         if 'Treatment Outcome' in data.columns:
-            treatment_effectiveness = data.groupby('Medication')['Treatment Outcome'].value_counts(normalize=True).unstack()
+            treatment_effectiveness = data.groupby('Medication', observed=True)['Treatment Outcome'].value_counts(normalize=True).unstack()
             fig = px.bar(treatment_effectiveness, barmode='stack')
             fig.update_layout(xaxis_title="Medication", yaxis_title="Proportion of Outcomes")
             st.plotly_chart(fig, use_container_width=True)
@@ -165,7 +163,7 @@ elif analysis_option == "Length of Stay Analysis":
 
     # Average Length of Stay by Medical Condition
     st.subheader("Average Length of Stay by Medical Condition")
-    avg_length_stay_by_condition = data.groupby('Medical Condition')['Length of Stay (Days)'].mean().reset_index()
+    avg_length_stay_by_condition = analytics.los_by_condition(data).reset_index()
     fig = px.bar(x=avg_length_stay_by_condition['Medical Condition'], y=avg_length_stay_by_condition['Length of Stay (Days)'], 
                  title="Average Length of Stay by Medical Condition")
     fig.update_layout(xaxis_title="Medical Condition", yaxis_title="Average Length of Stay (Days)")
@@ -173,8 +171,7 @@ elif analysis_option == "Length of Stay Analysis":
 
     # Length of Stay Over Time
     st.subheader("Length of Stay Over Time")
-    avg_length_stay_over_time = data.groupby(data['Date of Admission'].dt.to_period('M'))['Length of Stay (Days)'].mean()
-    avg_length_stay_over_time.index = avg_length_stay_over_time.index.astype(str)
+    avg_length_stay_over_time = analytics.monthly_avg_los(data)
     fig = px.line(x=avg_length_stay_over_time.index, y=avg_length_stay_over_time.values, 
                   title="Average Length of Stay Over Time")
     fig.update_layout(xaxis_title="Month", yaxis_title="Average Length of Stay (Days)")
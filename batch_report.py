@@ -0,0 +1,77 @@
+import argparse
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+# Render without a display; must be set before pyplot is imported
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+
+import analytics
+import report_charts
+
+FORMATS = ['png', 'svg']
+
+
+def render_chart(report, name, metric, output_dir, formats):
+    # Runs in a worker process: draw one chart and save it in every requested format
+    _, chart = report_charts.CHARTS[report][name]
+    fig = chart(metric)
+    paths = []
+    for fmt in formats:
+        path = os.path.join(output_dir, f'{report}_{name}.{fmt}')
+        fig.savefig(path, format=fmt, bbox_inches='tight')
+        paths.append(path)
+    plt.close(fig)
+    return report, name, paths
+
+
+def write_index(output_dir, rendered):
+    # One HTML page showing every chart, grouped by report
+    sections = []
+    for report, charts in report_charts.CHARTS.items():
+        images = ''.join(
+            f'<img src="{html.escape(os.path.basename(rendered[report, name][0]))}" alt="{html.escape(name)}">\n'
+            for name in charts
+        )
+        sections.append(f'<h2>{html.escape(report.title())} Analysis</h2>\n{images}')
+    page = '<!DOCTYPE html>\n<html>\n<head><title>Healthcare Data Insights Report</title></head>\n<body>\n' \
+           '<h1>Healthcare Data Insights Report</h1>\n' + '\n'.join(sections) + '</body>\n</html>\n'
+    path = os.path.join(output_dir, 'index.html')
+    with open(path, 'w') as f:
+        f.write(page)
+    return path
+
+
+def render_report(output_dir, formats=FORMATS, workers=None):
+    """Render every demographic, timeline and treatment chart into `output_dir`.
+
+    The data is loaded and all metrics computed once; the charts are then drawn in
+    parallel by a pool of `workers` processes (one per core by default).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    metrics = analytics.all_metrics(analytics.load_data(columns=analytics.REPORT_COLUMNS))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(render_chart, report, name, metrics[metric], output_dir, formats)
+            for report, charts in report_charts.CHARTS.items()
+            for name, (metric, _) in charts.items()
+        ]
+        rendered = {(report, name): paths for report, name, paths in (f.result() for f in futures)}
+
+    return write_index(output_dir, rendered)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Render all analysis charts to files, without a display.")
+    parser.add_argument('--output-dir', default='report', help="Directory to write the charts to")
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS, help="Image formats to write")
+    parser.add_argument('--workers', type=int, default=None, help="Number of render processes (default: all cores)")
+    args = parser.parse_args()
+
+    index_path = render_report(args.output_dir, args.formats, args.workers)
+    print(f"Report saved to {index_path}.")
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from cleaning import clean_file
+from data_store import CATEGORICAL_COLUMNS, compact_frame, load_cleaned
+from generate_data import generate_dataset
+from quantiles import QUANTILE_PATH
+from rollups import ROLLUP_PATH
+from uploads import clean_dashboard_data
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app_2.py')
+RESULTS_PATH = 'benchmark_results.json'
+
+# The dashboard's first page (Overview) must not import these, and its own imports must
+# stay within the budget
+DEFERRED_MODULES = ['seaborn', 'matplotlib', 'plotly.express', 'wordcloud']
+IMPORT_BUDGET_SECONDS = 1.0
+
+# Renders the first page in a fresh interpreter; Streamlit's own imports happen before the marker
+COLD_START_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+AppTest.from_string('import streamlit as st').run()
+print('--- app ---', file=sys.stderr, flush=True)
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=3600).run()
+print(json.dumps({'seconds': time.perf_counter() - start, 'modules': sorted(sys.modules)}))
+"""
+
+
+def measure(func, memory=True):
+    """Run `func` once for its wall time and, with `memory`, once more under tracemalloc for its
+    peak Python/NumPy allocation (Arrow buffers are not traced). `func` must be repeatable."""
+    start = time.perf_counter()
+    func()
+    result = {'seconds': round(time.perf_counter() - start, 4)}
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            result['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def cold_start(workdir):
+    """First dashboard page in a new process: its total time, the time spent importing
+    modules (from -X importtime) and the deferred modules it imported anyway."""
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', COLD_START_SCRIPT, APP_PATH],
+                             cwd=workdir, capture_output=True, text=True, check=True)
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    import_time = 0
+    for line in process.stderr.split('--- app ---', 1)[1].splitlines():
+        # "import time: self [us] | cumulative | name", nested imports indented under the name
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|', 2)
+            if cumulative.strip().isdigit() and not name[1:].startswith(' '):
+                import_time += int(cumulative)
+    return {
+        'seconds': round(result['seconds'], 4),
+        'import_seconds': round(import_time / 1e6, 4),
+        'deferred_imported': [name for name in DEFERRED_MODULES if name in result['modules']],
+    }
+
+
+def check_cold_start(result, budget=IMPORT_BUDGET_SECONDS):
+    # Problems with a cold_start() result, if any
+    problems = []
+    if result['deferred_imported']:
+        problems.append(f"first page imported {', '.join(result['deferred_imported'])}")
+    if result['import_seconds'] > budget:
+        problems.append(f"first page spent {result['import_seconds']:.2f}s importing (budget {budget:.2f}s)")
+    return problems
+
+
+def run_dashboard(app, view, clear_resources=False):
+    # Show `view` in the dashboard with its results cache cleared (and the dataset, if asked)
+    if clear_resources:
+        st.cache_resource.clear()
+    st.cache_data.clear()
+    app.sidebar.selectbox[0].set_value(view).run()
+    if app.exception:
+        raise RuntimeError(f"{view} failed: {app.exception[0].value}")
+
+
+def benchmark_size(rows, seed, workdir, memory=True):
+    """Time (and memory-profile) every stage on a generated dataset of `rows` admissions."""
+    csv_path = os.path.join(workdir, 'healthcare_dataset.csv')
+    store_path = os.path.join(workdir, 'cleaned_healthcare_data.arrow')
+    rollup_path = os.path.join(workdir, ROLLUP_PATH)
+    quantile_path = os.path.join(workdir, QUANTILE_PATH)
+    results = {}
+
+    results['generate'] = measure(lambda: generate_dataset(csv_path, rows, seed), memory=False)
+    results['read_csv'] = measure(lambda: pd.read_csv(csv_path), memory)
+    results['clean_file'] = measure(lambda: clean_file(csv_path, store_path=store_path, rollup_path=rollup_path,
+                                                       quantile_path=quantile_path), memory)
+    results['load_store'] = measure(lambda: load_cleaned(path=store_path), memory)
+
+    raw = pd.read_csv(csv_path, dtype={col: 'category' for col in CATEGORICAL_COLUMNS})
+    results['clean_data'] = measure(lambda: compact_frame(clean_dashboard_data(raw.copy(deep=False))), memory)
+    del raw
+
+    results['cold_start'] = cold_start(workdir)
+
+    # The dashboard reads the store from its working directory
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        app = AppTest.from_file(APP_PATH, default_timeout=3600).run()
+        views = app.sidebar.selectbox[0].options
+        results['dashboard_load'] = measure(lambda: run_dashboard(app, views[0], clear_resources=True), memory)
+        for view in views:
+            results[f'view: {view}'] = measure(lambda: run_dashboard(app, view), memory)
+            # Revisiting the tab with the same settings should be a cache hit
+            results[f'view: {view} (cached)'] = measure(lambda: app.run(), memory)
+    finally:
+        os.chdir(cwd)
+
+    return [{'rows': rows, 'step': step, **result} for step, result in results.items()]
+
+
+def compare(results, baseline_path):
+    # Print each step's time relative to the same step and size in an earlier results file
+    with open(baseline_path) as f:
+        baseline = {(r['rows'], r['step']): r for r in json.load(f)['results']}
+    for result in results:
+        before = baseline.get((result['rows'], result['step']))
+        if before and before['seconds'] > 0:
+            change = result['seconds'] / before['seconds'] - 1
+            print(f"{result['rows']:>10} {result['step']:<45} {before['seconds']:>9.3f}s -> "
+                  f"{result['seconds']:>9.3f}s ({change:+.0%})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark loading, cleaning and the dashboard views on synthetic data.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000],
+                        help="Dataset sizes to benchmark (10K to 50M rows)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic data")
+    parser.add_argument('--output', default=RESULTS_PATH, help="JSON file to write the results to")
+    parser.add_argument('--baseline', help="Earlier results file to compare the timings against")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the (slower) memory-profiled runs")
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET_SECONDS,
+                        help="Seconds the first dashboard page may spend importing modules")
+    args = parser.parse_args()
+
+    results = []
+    problems = []
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as workdir:
+            for result in benchmark_size(rows, args.seed, workdir, memory=not args.no_memory):
+                print(f"{result['rows']:>10} {result['step']:<45} {result['seconds']:>9.3f}s"
+                      + (f" {result['peak_mb']:>10.1f} MB" if 'peak_mb' in result else '')
+                      + (f" (imports {result['import_seconds']:.3f}s)" if 'import_seconds' in result else ''))
+                results.append(result)
+                if result['step'] == 'cold_start':
+                    problems += [f"{rows} rows: {problem}" for problem in check_cold_start(result, args.import_budget)]
+
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.output}.")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+    if problems:
+        print("Cold start check failed:\n" + '\n'.join(problems))
+        sys.exit(1)
@@ -0,0 +1,225 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_profile import Profiler, source_stamp, write_profile
+from data_store import DATE_COLUMNS, StoreWriter, clear_batches, hash_index_path, normalize_categories, with_raw_dtypes
+from date_parsing import detect_date_format, parse_dates
+from quantiles import build_sketches, merge_sketches, write_sketches
+from rollups import build_rollup, merge_rollups, write_rollup
+
+
+def clean_chunk(data, date_formats=None):
+    # `date_formats` remembers each date column's detected format across chunks
+    if date_formats is None:
+        date_formats = {}
+
+    # 1. Normalize 'Name' column
+    data['Name'] = data['Name'].str.title()
+
+    # 2. Convert date columns to datetime
+    for col in DATE_COLUMNS:
+        if col not in date_formats:
+            date_formats[col] = detect_date_format(data[col])
+        data[col] = parse_dates(data[col], date_format=date_formats[col])
+
+    return data
+
+
+# Near-duplicates share the blocking key exactly and the normalized key after normalize_text,
+# e.g. the same admission date and hospital for a name that differs only in casing or spacing
+FUZZY_BLOCK_COLUMNS = ['Date of Admission']
+FUZZY_NORMALIZED_COLUMNS = ['Name', 'Hospital']
+
+
+def hash_rows(data):
+    """One 64-bit fingerprint per row, of a canonical form of its values: numbers as float64
+    and datetimes in nanoseconds, so a row hashes the same whatever dtypes its chunk or batch
+    was inferred with (e.g. integers that became floats next to a blank value)."""
+    canonical = {}
+    for col in data.columns:
+        values = data[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.astype('datetime64[ns]')
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            values = values.astype('float64')
+        canonical[col] = values
+    return pd.util.hash_pandas_object(pd.DataFrame(canonical, index=data.index), index=False).to_numpy()
+
+
+def normalize_text(values):
+    # Case-fold, and turn runs of whitespace and punctuation into single spaces
+    return values.str.casefold().str.replace(r'[\W_]+', ' ', regex=True).str.strip()
+
+
+def fuzzy_keys(data):
+    """One 64-bit near-duplicate key per row: the blocking columns as they are plus the
+    normalized columns, normalized on their distinct values only."""
+    key = data[FUZZY_BLOCK_COLUMNS].copy()
+    for col in FUZZY_NORMALIZED_COLUMNS:
+        # Hashing a categorical hashes its values, so keys stay comparable across chunks
+        key[col] = normalize_categories(data[col], normalize_text)
+    return hash_rows(key)
+
+
+def first_occurrences(hashes):
+    # Mask of the first row carrying each hash
+    _, first = np.unique(hashes, return_index=True)
+    mask = np.zeros(len(hashes), dtype=bool)
+    mask[first] = True
+    return mask
+
+
+class RowHashSet:
+    """Set of 64-bit row hashes kept as sorted uint64 arrays (8 bytes per row).
+
+    `parts` are read-only sorted arrays, e.g. memory-mapped indexes of data stored
+    earlier. Hashes added here are kept as sorted in-memory runs, and the newest run is
+    merged into the one before whenever it is at least half its size, so adding n hashes
+    costs O(n log n) overall and a lookup searches O(log n) runs.
+    """
+
+    def __init__(self, parts=()):
+        self.parts = list(parts)
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(part) for part in self.runs + self.parts)
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for part in self.runs + self.parts:
+            if len(part) == 0:
+                continue
+            pos = np.searchsorted(part, hashes)
+            pos[pos == len(part)] = 0
+            found |= part[pos] == hashes
+        return found
+
+    def add(self, hashes):
+        if len(hashes):
+            self.runs.append(np.sort(hashes))
+        while len(self.runs) > 1 and 2 * len(self.runs[-1]) >= len(self.runs[-2]):
+            newest = self.runs.pop()
+            # Both runs are sorted, so the stable (merge) sort is linear
+            self.runs[-1] = np.sort(np.concatenate([self.runs[-1], newest]), kind='stable')
+
+    def hashes(self):
+        # Every added hash, as one sorted array
+        return np.sort(np.concatenate(self.runs), kind='stable') if self.runs else np.empty(0, dtype=np.uint64)
+
+    def save(self, path):
+        np.save(path, self.hashes())
+
+    @classmethod
+    def load(cls, paths):
+        return cls([np.load(path, mmap_mode='r') for path in paths if os.path.exists(path)])
+
+
+class Deduplicator:
+    """Single-pass duplicate filter for a stream of chunks.
+
+    Exact duplicates are found by their 64-bit row fingerprint (see hash_rows). With `fuzzy` set, rows
+    whose fuzzy_keys match an earlier row are dropped as near-duplicates too. Only the
+    sorted hashes of distinct rows are held (8 bytes per row and mode), never the rows.
+    `parts` are fingerprints of data kept earlier, as for RowHashSet.
+    """
+
+    def __init__(self, fuzzy=False, parts=()):
+        self.rows = RowHashSet(parts)
+        self.keys = RowHashSet() if fuzzy else None
+        self.duplicates = 0
+        self.near_duplicates = 0
+
+    def filter(self, chunk):
+        # Mask of the rows of `chunk` to keep, within the chunk and against earlier chunks
+        hashes = hash_rows(chunk)
+        keep = first_occurrences(hashes) & ~self.rows.contains(hashes)
+        self.duplicates += int((~keep).sum())
+        # Near-duplicates are remembered too, so a later exact copy of one counts as a duplicate
+        self.rows.add(hashes[keep])
+
+        if self.keys is not None:
+            kept = np.flatnonzero(keep)
+            keys = fuzzy_keys(chunk.iloc[kept])
+            new = first_occurrences(keys) & ~self.keys.contains(keys)
+            keep[kept[~new]] = False
+            self.near_duplicates += int((~new).sum())
+            self.keys.add(keys[new])
+
+        return keep
+
+
+def read_chunks(file_path, chunk_size=None):
+    """(text, typed) pairs of raw chunks: every value as the text it was read as, which is what
+    gets profiled (as in data_profile.profile_file), and the chunk with RAW_DTYPES applied, so
+    every chunk gets the same numeric dtypes and chunked and in-memory cleaning write the same rows."""
+    chunks = [pd.read_csv(file_path, dtype=str)] if chunk_size is None else pd.read_csv(
+        file_path, chunksize=chunk_size, dtype=str)
+    for text in chunks:
+        yield text, with_raw_dtypes(text)
+
+
+def clean_file(file_path, cleaned_file_path=None, chunk_size=None, store_path=None, rollup_path=None,
+               fuzzy=False, date_formats=None, profile_path=None, quantile_path=None):
+    """Clean `file_path` into the CSV `cleaned_file_path` and/or the columnar store `store_path`.
+
+    With `rollup_path` set, the aggregate rollup of the cleaned rows is built chunk by
+    chunk and written there as well; likewise the quantile sketches with `quantile_path`.
+
+    With `chunk_size` set, the input is read `chunk_size` rows at a time and rows
+    already written by an earlier chunk are dropped via their row hash, so only
+    one chunk plus the hash set is held in memory. With `fuzzy` set, near-duplicates
+    (see fuzzy_keys) are dropped as well. The store gets a row hash index so that
+    ingest.py can dedupe new batches against it.
+    `date_formats` maps date columns to known formats (e.g. from a profile) so they aren't
+    detected again. With `profile_path` set, the raw rows are profiled in the same pass.
+    Returns the duplicate and near-duplicate counts and the missing values per column.
+    """
+    dedupe = Deduplicator(fuzzy)
+    missing_values = None
+    header = True
+    store = StoreWriter(store_path) if store_path is not None else None
+    rollup = None
+    sketches = None
+    date_formats = dict(date_formats or {})
+    profiler = Profiler() if profile_path is not None else None
+
+    for text, chunk in read_chunks(file_path, chunk_size):
+        if profiler is not None:
+            profiler.update(text)
+        chunk = clean_chunk(chunk, date_formats)
+
+        # 3. Drop duplicates, within the chunk and against earlier chunks
+        chunk = chunk[dedupe.filter(chunk)]
+
+        # 4. Handle missing values (if any)
+        chunk_missing = chunk.isnull().sum()
+        missing_values = chunk_missing if missing_values is None else missing_values + chunk_missing
+
+        if cleaned_file_path is not None:
+            chunk.to_csv(cleaned_file_path, index=False, mode='w' if header else 'a', header=header)
+            header = False
+        if rollup_path is not None:
+            chunk_rollup = build_rollup(chunk)
+            rollup = chunk_rollup if rollup is None else merge_rollups(rollup, chunk_rollup)
+        if quantile_path is not None:
+            chunk_sketches = build_sketches(chunk)
+            sketches = chunk_sketches if sketches is None else merge_sketches(sketches, chunk_sketches)
+        if store is not None:
+            store.write(chunk)
+
+    if store is not None:
+        # A full clean replaces any batches appended by ingest.py
+        store.close()
+        dedupe.rows.save(hash_index_path(store_path))
+        clear_batches(store_path)
+    if sketches is not None:
+        write_sketches(sketches, quantile_path)
+    if rollup is not None:
+        write_rollup(rollup, rollup_path)
+    if profiler is not None:
+        write_profile(profiler.to_dict(source_stamp(file_path)), profile_path)
+
+    return dedupe.duplicates, dedupe.near_duplicates, missing_values
@@ -0,0 +1,249 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from date_parsing import detect_date_format, parse_dates
+
+# One-pass profiles of raw CSV files. Every column keeps a fixed-size summary that is updated
+# chunk by chunk: null and type counts, numeric moments, date range, a HyperLogLog sketch for
+# the distinct count and a Misra-Gries summary for the most frequent values. Memory depends on
+# the number of columns and the chunk size, not on the number of rows.
+CHUNK_SIZE = 200_000
+HLL_PRECISION = 14
+HEAVY_HITTER_CAPACITY = 64
+TOP_VALUES = 10
+
+
+def profile_path(source):
+    # Profile file written next to a raw CSV
+    return f'{os.path.splitext(source)[0]}.profile.json'
+
+
+def source_stamp(path):
+    # Size and modification time of a file, to tell whether a profile is still current
+    stat = os.stat(path)
+    return {'path': os.path.basename(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class HyperLogLog:
+    """Approximate distinct count of 64-bit hashes, in 2**precision one-byte registers
+    (standard error about 1.04 / sqrt(2**precision), 0.8% by default).
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        buckets = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # Position of the first 1 bit after the bucket bits, read from their top 32 bits
+        rest = ((hashes << np.uint64(self.precision)) >> np.uint64(32)).astype(np.float64)
+        ranks = np.where(rest > 0, 33 - np.frexp(rest)[1], 33).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def count(self):
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and zeros:
+            # Small cardinalities: linear counting over the empty registers
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class HeavyHitters:
+    """Misra-Gries summary of the most frequent values, holding at most `capacity` counters.
+
+    Every kept count undercounts its value by at most `error`, and any value more frequent
+    than `error` is kept.
+    """
+
+    def __init__(self, capacity=HEAVY_HITTER_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.error = 0
+
+    def add(self, counts):
+        # Fold in exact counts (value -> count), e.g. a chunk's value_counts()
+        merged = self.counts.add(counts, fill_value=0)
+        if len(merged) > self.capacity:
+            cut = merged.nlargest(self.capacity + 1).iloc[-1]
+            merged = merged[merged > cut] - cut
+            self.error += int(cut)
+        self.counts = merged.astype('int64')
+
+    def top(self, n=TOP_VALUES):
+        return self.counts.sort_values(ascending=False, kind='stable').head(n)
+
+
+class ColumnProfile:
+    """Summary of one column: row and null counts, how many values parse as numbers (and
+    integers) or as dates in the column's detected format, their ranges, and the sketches."""
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.numeric = 0
+        self.integers = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.date_format = None
+        self.dates = 0
+        self.first_date = None
+        self.last_date = None
+        self.distinct = HyperLogLog()
+        self.frequent = HeavyHitters()
+        self._detected = False
+
+    def update(self, values):
+        # Fold in one chunk of the column; values are profiled as the text they were read as
+        self.count += len(values)
+        present = values.dropna().astype(str)
+        self.nulls += len(values) - len(present)
+        if present.empty:
+            return
+
+        self.distinct.add(pd.util.hash_array(present.to_numpy(dtype=object)))
+        self.frequent.add(present.value_counts())
+
+        numbers = pd.to_numeric(present, errors='coerce')
+        numeric = numbers.notna().to_numpy()
+        if numeric.any():
+            numbers = numbers[numeric].astype('float64')
+            self.numeric += int(numeric.sum())
+            self.integers += int(((numbers % 1 == 0) & ~present[numeric].str.contains('.', regex=False)).sum())
+            self.total += numbers.sum()
+            self.total_squares += (numbers ** 2).sum()
+            self.minimum = numbers.min() if self.minimum is None else min(self.minimum, numbers.min())
+            self.maximum = numbers.max() if self.maximum is None else max(self.maximum, numbers.max())
+
+        if not self._detected:
+            # Columns that are mostly numbers are not dates; otherwise the format is fixed by the first chunk
+            self._detected = True
+            if numeric.mean() < 0.5:
+                self.date_format = detect_date_format(present)
+        if self.date_format is not None:
+            dates = parse_dates(present, errors='coerce', date_format=self.date_format).dropna()
+            if not dates.empty:
+                self.dates += len(dates)
+                self.first_date = dates.min() if self.first_date is None else min(self.first_date, dates.min())
+                self.last_date = dates.max() if self.last_date is None else max(self.last_date, dates.max())
+
+    def kind(self):
+        # Inferred type: every non-null value parses as it
+        present = self.count - self.nulls
+        if present == 0:
+            return 'empty'
+        if self.numeric == present:
+            return 'integer' if self.integers == present else 'float'
+        if self.date_format is not None and self.dates == present:
+            return 'datetime'
+        return 'string'
+
+    def to_dict(self):
+        profile = {
+            'type': self.kind(),
+            'count': self.count,
+            'nulls': self.nulls,
+            'distinct': self.distinct.count(),
+            'top': [[value, int(count)] for value, count in self.frequent.top().items()],
+            'top_error': self.frequent.error,
+        }
+        present = self.count - self.nulls
+        if present and self.numeric == present:
+            mean = self.total / present
+            profile.update({
+                'min': float(self.minimum),
+                'max': float(self.maximum),
+                'mean': mean,
+                'std': float(np.sqrt(max(self.total_squares / present - mean ** 2, 0))),
+            })
+        if self.date_format is not None:
+            profile.update({
+                'date_format': self.date_format,
+                'invalid_dates': present - self.dates,
+                'min': None if self.first_date is None else self.first_date.isoformat(),
+                'max': None if self.last_date is None else self.last_date.isoformat(),
+            })
+        return profile
+
+
+class Profiler:
+    """Streaming profile of a table, updated one chunk at a time."""
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for col in chunk.columns:
+            self.columns.setdefault(col, ColumnProfile()).update(chunk[col])
+
+    def to_dict(self, source=None):
+        return {
+            'source': source,
+            'rows': self.rows,
+            'columns': {col: column.to_dict() for col, column in self.columns.items()},
+        }
+
+
+def profile_file(path, chunk_size=CHUNK_SIZE):
+    """Profile a CSV file in one pass, `chunk_size` rows at a time. Returns the profile as a dict."""
+    profiler = Profiler()
+    for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=str):
+        profiler.update(chunk)
+    return profiler.to_dict(source_stamp(path))
+
+
+def write_profile(profile, path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_profile(path, source=None):
+    """The profile at `path`, or None when there is none or, given the `source` file it was
+    made from, when that file has changed since."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        profile = json.load(f)
+    if source is not None and (not os.path.exists(source) or profile.get('source') != source_stamp(source)):
+        return None
+    return profile
+
+
+def profile_date_formats(profile):
+    # Detected date format of each date column, to skip format detection when cleaning
+    return {col: column['date_format'] for col, column in profile['columns'].items() if column['type'] == 'datetime'}
+
+
+def range_text(value):
+    # A numeric or date bound as text, so both kinds fit one column
+    if value is None:
+        return ''
+    return f'{value:g}' if isinstance(value, float) else value.replace('T00:00:00', '')
+
+
+def profile_table(profile):
+    # One row per column, for printing or display
+    rows = []
+    for col, column in profile['columns'].items():
+        rows.append({
+            'column': col,
+            'type': column['type'],
+            'nulls': column['nulls'],
+            'distinct (approx.)': column['distinct'],
+            'min': range_text(column.get('min')),
+            'max': range_text(column.get('max')),
+            'mean': column.get('mean'),
+            'top values': ', '.join(f"{value} ({count})" for value, count in column['top'][:3]),
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,247 @@
+import glob
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from date_parsing import parse_dates
+
+RAW_DATA_PATH = 'healthcare_dataset.csv'
+
+# Cleaned data is stored as an uncompressed Arrow IPC (Feather v2) file so it can be memory-mapped
+CLEANED_STORE_PATH = 'cleaned_healthcare_data.arrow'
+CLEANED_CSV_PATH = 'cleaned_healthcare_data.csv'
+
+DATE_COLUMNS = ['Date of Admission', 'Discharge Date']
+CATEGORICAL_COLUMNS = ['Gender', 'Blood Type', 'Medical Condition', 'Insurance Provider', 'Admission Type', 'Medication',
+                       'Test Results', 'Treatment Outcome']
+NARROW_INTEGERS = {'Age': 'uint8', 'Room Number': 'uint16'}
+# Numeric columns of the raw file, read with a fixed (nullable) dtype: otherwise one blank value
+# turns a chunk's or a batch's integers into floats. Row hashes don't depend on it either way
+RAW_DTYPES = {'Age': 'Int64', 'Room Number': 'Int64', 'Billing Amount': 'float64'}
+
+DICTIONARY_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+
+def with_raw_dtypes(data):
+    # A raw frame read as text, with RAW_DTYPES applied to its numeric columns. Values that
+    # aren't numbers become missing, and an integer column holding fractions stays float64
+    data = data.copy(deep=False)
+    for col, dtype in RAW_DTYPES.items():
+        if col in data.columns:
+            values = pd.to_numeric(data[col], errors='coerce')
+            if dtype == 'Int64' and not (values.dropna() % 1 == 0).all():
+                dtype = 'float64'
+            data[col] = values.astype(dtype)
+    return data
+
+
+def to_columnar(data, categories=None):
+    """Cast a cleaned frame to the store's dtypes.
+
+    `categories` maps each categorical column to its dictionary so far; new values
+    are appended to it, which keeps codes stable across chunks.
+    """
+    if categories is None:
+        categories = {}
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in data.columns:
+            known = categories.get(col, pd.Index([], dtype=object))
+            new = pd.Index(data[col].dropna().unique(), dtype=object).difference(known)
+            categories[col] = known.append(new)
+            data[col] = pd.Categorical(data[col], categories=categories[col])
+
+    for col, dtype in NARROW_INTEGERS.items():
+        if col in data.columns and pd.api.types.is_integer_dtype(data[col]):
+            limits = np.iinfo(dtype)
+            if data[col].hasnans:
+                # Stored as float64 with NaN whichever chunk the missing values turn up in
+                # (StoreWriter widens the column then), as pandas reads integers with nulls back
+                data[col] = data[col].astype('float64')
+            elif data[col].between(limits.min, limits.max).all():
+                data[col] = data[col].astype(dtype)
+
+    return data
+
+
+def normalize_categories(series, func, fill_value=None):
+    """Apply the string function `func` (Index -> Index) to a column's distinct values only.
+
+    The column is dictionary-encoded if it isn't already, `func` runs on its categories
+    (categories that end up equal are merged), and missing values become `fill_value`.
+    Returns a categorical.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+
+    normalized = func(series.cat.categories)
+    categories = pd.Index(normalized.unique())
+    codes = series.cat.codes.to_numpy()
+    missing = codes < 0
+    fill = fill_value is not None and missing.any()
+    if fill and fill_value not in categories:
+        categories = categories.append(pd.Index([fill_value]))
+
+    # Old code -> new code, with a trailing -1 so missing codes stay missing
+    mapping = np.append(categories.get_indexer(normalized), -1)
+    new_codes = mapping[codes]
+    if fill:
+        new_codes[missing] = categories.get_loc(fill_value)
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories), index=series.index, name=series.name)
+
+
+def fill_and_strip(series, value="Unknown"):
+    # Fill missing values with `value` and strip surrounding whitespace, on the dictionary
+    return normalize_categories(series, lambda categories: categories.str.strip(), fill_value=value)
+
+
+def compact_frame(data, max_ratio=0.5):
+    """Shrink a frame's in-memory footprint without changing its values.
+
+    Text columns with at most `max_ratio` distinct values per row become categoricals,
+    integers are downcast to the narrowest type that holds them, and floats become
+    float32 when every value survives the round trip exactly.
+    """
+    for col in data.columns:
+        series = data[col]
+        if pd.api.types.is_string_dtype(series) or series.dtype == object:
+            if series.nunique() <= max_ratio * len(series):
+                data[col] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series):
+            data[col] = pd.to_numeric(series, downcast='unsigned' if (series >= 0).all() else 'integer')
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            narrow = series.astype(np.float32)
+            if ((narrow.astype(series.dtype) == series) | series.isna()).all():
+                data[col] = narrow
+    return data
+
+
+class StoreWriter:
+    """Write cleaned chunks to the columnar store, replacing it atomically on close."""
+
+    def __init__(self, path=CLEANED_STORE_PATH):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.categories = {}
+        self.schema = None
+        self.writer = None
+
+    def write(self, data):
+        data = to_columnar(data.copy(deep=False), self.categories)
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        if self.writer is None:
+            self.open(pa.schema(
+                [pa.field(f.name, DICTIONARY_TYPE) if pa.types.is_dictionary(f.type) else f for f in table.schema],
+                metadata=table.schema.metadata,
+            ))
+        widened = [f.name for f in self.schema
+                   if pa.types.is_integer(f.type) and pa.types.is_floating(table.schema.field(f.name).type)]
+        if widened:
+            self.widen(widened)
+        self.writer.write_table(table.cast(self.schema))
+
+    def open(self, schema):
+        self.schema = schema
+        # Growing dictionaries are written as deltas, which the IPC file format allows
+        options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        self.writer = pa.ipc.new_file(self.tmp_path, self.schema, options=options)
+
+    def widen(self, columns):
+        # An integer column that gets fractions or missing values in a later chunk (e.g. an Age
+        # of 26.5) becomes float64: the batches written so far are copied over to the widened schema, one at a time
+        self.writer.close()
+        old_path = f"{self.tmp_path}.old"
+        os.replace(self.tmp_path, old_path)
+        self.open(pa.schema([pa.field(f.name, pa.float64()) if f.name in columns else f for f in self.schema],
+                            metadata=self.schema.metadata))
+        with pa.memory_map(old_path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                self.writer.write_batch(reader.get_batch(i).cast(self.schema))
+        os.remove(old_path)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self.writer is not None:
+            self.writer.close()
+            os.remove(self.tmp_path)
+
+
+def write_cleaned(data, path=CLEANED_STORE_PATH):
+    with StoreWriter(path) as writer:
+        writer.write(data)
+
+
+def batch_dir(path=CLEANED_STORE_PATH):
+    # Batches appended by ingest.py are kept as separate files next to the store
+    return os.path.splitext(path)[0] + '_batches'
+
+
+def store_parts(path=CLEANED_STORE_PATH):
+    # The base store followed by its appended batches, oldest first
+    directory = batch_dir(path)
+    return [path] + sorted(glob.glob(os.path.join(directory, 'batch-*.arrow')))
+
+
+def next_batch_path(path=CLEANED_STORE_PATH):
+    os.makedirs(batch_dir(path), exist_ok=True)
+    return os.path.join(batch_dir(path), f'batch-{len(store_parts(path)):05d}.arrow')
+
+
+def clear_batches(path=CLEANED_STORE_PATH):
+    shutil.rmtree(batch_dir(path), ignore_errors=True)
+
+
+def hash_index_path(part_path):
+    # Sorted row hashes of one store part, used to dedupe later batches against it
+    return os.path.splitext(part_path)[0] + '.hashes.npy'
+
+
+def store_version(path=CLEANED_STORE_PATH):
+    # Changes whenever the store, one of its batches or the CSV fallback is rewritten
+    paths = store_parts(path) if os.path.exists(path) else [CLEANED_CSV_PATH]
+    return tuple((part, os.stat(part).st_mtime_ns, os.stat(part).st_size) for part in paths)
+
+
+def store_columns(path=CLEANED_STORE_PATH):
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def load_cleaned(columns=None, path=CLEANED_STORE_PATH):
+    """Load the cleaned dataset, memory-mapped and limited to `columns`.
+
+    Requested columns that the dataset does not have are skipped. Falls back to the
+    cleaned CSV when the columnar store has not been built yet.
+    """
+    if not os.path.exists(path):
+        return load_cleaned_csv(columns)
+
+    if columns is not None:
+        available = store_columns(path)
+        columns = [col for col in columns if col in available]
+    tables = [feather.read_table(part, columns=columns, memory_map=True) for part in store_parts(path)]
+    table = tables[0] if len(tables) == 1 else pa.concat_tables(tables, promote_options='permissive')
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def load_cleaned_csv(columns=None, path=CLEANED_CSV_PATH):
+    data = pd.read_csv(path, usecols=None if columns is None else lambda col: col in columns,
+                       dtype={col: 'category' for col in CATEGORICAL_COLUMNS})
+    for col in DATE_COLUMNS:
+        if col in data.columns:
+            data[col] = parse_dates(data[col])
+    return to_columnar(data)
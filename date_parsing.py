@@ -0,0 +1,39 @@
+import warnings
+
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+SAMPLE_SIZE = 1000
+
+
+def detect_date_format(values, sample_size=SAMPLE_SIZE):
+    """Guess the strftime format of date strings from a sample of `values`.
+
+    Returns the format most sample values agree on, or None when none can be guessed.
+    """
+    sample = pd.Series(values).dropna().head(sample_size).astype(str).unique()
+    with warnings.catch_warnings():
+        # Ambiguous day/month orders warn once per value here; to_datetime warns again if it matters
+        warnings.simplefilter('ignore')
+        formats = pd.Series([guess_datetime_format(value) for value in sample], dtype=object).value_counts()
+    return formats.index[0] if len(formats) else None
+
+
+def parse_dates(series, errors='raise', date_format=None):
+    """Vectorized pd.to_datetime for columns of date strings.
+
+    Each distinct string is parsed once, with `date_format` (detected from a sample when
+    not given), and the result is mapped back to the rows. `errors` behaves as in
+    pd.to_datetime, so errors='coerce' turns invalid dates into NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return pd.Series(pd.NaT, index=series.index, name=series.name, dtype='datetime64[ns]')
+    if date_format is None:
+        date_format = detect_date_format(uniques)
+    parsed = pd.to_datetime(uniques, format=date_format, errors=errors)
+    values = parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(values, index=series.index, name=series.name)
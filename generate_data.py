@@ -0,0 +1,160 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Synthetic admissions in the format of healthcare_dataset.csv. Output depends only on the seed
+# and the row count: every block of CHUNK_ROWS rows has its own random stream.
+CHUNK_ROWS = 1_000_000
+DUPLICATE_RATE = 0.01
+
+FIRST_NAMES = [
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+    'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Christopher', 'Karen',
+    'Charles', 'Lisa', 'Daniel', 'Nancy', 'Matthew', 'Betty', 'Anthony', 'Sandra', 'Mark', 'Margaret',
+    'Donald', 'Ashley', 'Steven', 'Kimberly', 'Andrew', 'Emily', 'Paul', 'Donna', 'Joshua', 'Michelle',
+    'Kenneth', 'Carol', 'Kevin', 'Amanda', 'Brian', 'Melissa', 'George', 'Deborah', 'Timothy', 'Stephanie',
+    'Ronald', 'Rebecca', 'Jason', 'Sharon', 'Edward', 'Laura', 'Jeffrey', 'Cynthia', 'Ryan', 'Dorothy',
+    'Jacob', 'Amy', 'Gary', 'Kathleen', 'Nicholas', 'Angela', 'Eric', 'Shirley', 'Jonathan', 'Emma',
+    'Stephen', 'Brenda', 'Larry', 'Pamela', 'Justin', 'Nicole', 'Scott', 'Anna', 'Brandon', 'Samantha',
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+    'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Ramirez', 'Lewis', 'Robinson',
+    'Walker', 'Young', 'Allen', 'King', 'Wright', 'Scott', 'Torres', 'Nguyen', 'Hill', 'Flores',
+    'Green', 'Adams', 'Nelson', 'Baker', 'Hall', 'Rivera', 'Campbell', 'Mitchell', 'Carter', 'Roberts',
+    'Gomez', 'Phillips', 'Evans', 'Turner', 'Diaz', 'Parker', 'Cruz', 'Edwards', 'Collins', 'Reyes',
+    'Stewart', 'Morris', 'Morales', 'Murphy', 'Cook', 'Rogers', 'Gutierrez', 'Ortiz', 'Morgan', 'Cooper',
+    'Peterson', 'Bailey', 'Reed', 'Kelly', 'Howard', 'Ramos', 'Kim', 'Cox', 'Ward', 'Richardson',
+    'Watson', 'Brooks', 'Chavez', 'Wood', 'James', 'Bennett', 'Gray', 'Mendoza', 'Ruiz', 'Hughes',
+    'Price', 'Alvarez', 'Castillo', 'Sanders', 'Patel', 'Myers', 'Long', 'Ross', 'Foster', 'Jimenez',
+]
+NAME_SUFFIXES = ['', '', '', '', '', '', '', '', 'Jr.', 'MD', 'PhD', 'DDS']
+COMPANY_SUFFIXES = ['Inc', 'LLC', 'Ltd', 'PLC', 'Group', 'and Sons']
+
+# Category -> relative frequency
+GENDERS = {'Male': 0.5, 'Female': 0.5}
+BLOOD_TYPES = {'O+': 0.37, 'A+': 0.36, 'B+': 0.09, 'O-': 0.07, 'A-': 0.06, 'AB+': 0.03, 'B-': 0.015, 'AB-': 0.005}
+MEDICAL_CONDITIONS = {'Hypertension': 0.26, 'Diabetes': 0.2, 'Arthritis': 0.17, 'Obesity': 0.15, 'Asthma': 0.13,
+                      'Cancer': 0.09}
+INSURANCE_PROVIDERS = {'Medicare': 0.3, 'Blue Cross': 0.22, 'UnitedHealthcare': 0.2, 'Aetna': 0.16, 'Cigna': 0.12}
+ADMISSION_TYPES = {'Emergency': 0.45, 'Urgent': 0.3, 'Elective': 0.25}
+MEDICATIONS = {'Lipitor': 0.24, 'Aspirin': 0.22, 'Ibuprofen': 0.2, 'Paracetamol': 0.19, 'Penicillin': 0.15}
+TEST_RESULTS = {'Normal': 0.45, 'Abnormal': 0.35, 'Inconclusive': 0.2}
+
+FIRST_ADMISSION = np.datetime64('2019-05-08')
+ADMISSION_DAYS = 1826
+
+
+def zipf_weights(n, exponent=1.1):
+    # Rank-frequency weights: a few hospitals/doctors/names account for most rows
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def random_casing(rng, values):
+    # Each letter upper or lower case at random, like the names in the raw dataset
+    return [''.join(c.upper() if flip else c.lower() for c, flip in zip(value, rng.random(len(value)) < 0.5))
+            for value in values]
+
+
+def make_pools(seed):
+    """Distinct names, doctors and hospitals, in a random rank order."""
+    rng = np.random.default_rng([seed, 0])
+    people = np.array([f'{first} {last}' for first in FIRST_NAMES for last in LAST_NAMES], dtype=object)
+    suffixes = rng.choice(NAME_SUFFIXES, len(people))
+    people = np.array([f'{name} {suffix}'.strip() for name, suffix in zip(people, suffixes)], dtype=object)
+    rng.shuffle(people)
+
+    last = np.array(LAST_NAMES, dtype=object)
+    hospitals = set()
+    while len(hospitals) < 5000:
+        a, b, c = rng.choice(last, 3, replace=False)
+        pattern = rng.integers(4)
+        if pattern == 0:
+            hospitals.add(f'{a} {rng.choice(COMPANY_SUFFIXES)}')
+        elif pattern == 1:
+            hospitals.add(f'{a} and {b}')
+        elif pattern == 2:
+            hospitals.add(f'{a}, {b} and {c}')
+        else:
+            hospitals.add(f'{a}-{b}')
+    hospitals = np.array(sorted(hospitals), dtype=object)
+    rng.shuffle(hospitals)
+
+    doctors = rng.permutation(people)[:4000]
+    return {
+        'Name': people,
+        'Name casings': np.array([random_casing(rng, people) for _ in range(3)], dtype=object),
+        'Doctor': doctors,
+        'Hospital': hospitals,
+    }
+
+
+def categorical(rng, frequencies, size):
+    return pd.Categorical.from_codes(rng.choice(len(frequencies), size, p=list(frequencies.values())),
+                                     list(frequencies))
+
+
+def generate_chunk(rng, pools, size):
+    """`size` synthetic admissions, ~DUPLICATE_RATE of them repeating an earlier row with a recased name."""
+    names = rng.choice(len(pools['Name']), size, p=zipf_weights(len(pools['Name']), 0.6))
+    casings = rng.integers(len(pools['Name casings']), size=size)
+    admission_offsets = rng.integers(ADMISSION_DAYS, size=size)
+    stays = np.minimum(rng.geometric(1 / 8, size), 30)
+    conditions = categorical(rng, MEDICAL_CONDITIONS, size)
+
+    # Older patients for chronic conditions; billing grows with the stay
+    ages = np.clip(rng.normal(50, 18, size) + np.where(np.isin(conditions, ['Arthritis', 'Hypertension']), 8, 0),
+                   13, 89).astype('int64')
+    billing = rng.lognormal(9.6, 0.55, size) * (1 + stays / 15)
+    billing[rng.random(size) < 0.002] *= -0.02
+
+    data = pd.DataFrame({
+        'Name': pools['Name casings'][casings, names],
+        'Age': ages,
+        'Gender': categorical(rng, GENDERS, size),
+        'Blood Type': categorical(rng, BLOOD_TYPES, size),
+        'Medical Condition': conditions,
+        'Date of Admission': FIRST_ADMISSION + admission_offsets,
+        'Doctor': pools['Doctor'][rng.choice(len(pools['Doctor']), size, p=zipf_weights(len(pools['Doctor'])))],
+        'Hospital': pools['Hospital'][rng.choice(len(pools['Hospital']), size, p=zipf_weights(len(pools['Hospital'])))],
+        'Insurance Provider': categorical(rng, INSURANCE_PROVIDERS, size),
+        'Billing Amount': billing,
+        'Room Number': rng.integers(101, 501, size),
+        'Admission Type': categorical(rng, ADMISSION_TYPES, size),
+        'Discharge Date': FIRST_ADMISSION + admission_offsets + stays,
+        'Medication': categorical(rng, MEDICATIONS, size),
+        'Test Results': categorical(rng, TEST_RESULTS, size),
+    })
+
+    # Re-entered admissions: an earlier row again, with the patient's name typed differently
+    repeats = np.flatnonzero(rng.random(size) < DUPLICATE_RATE)
+    repeats = repeats[repeats > 0]
+    if len(repeats):
+        sources = (rng.random(len(repeats)) * repeats).astype('int64')
+        data.iloc[repeats] = data.iloc[sources].to_numpy()
+        data.iloc[repeats, 0] = pools['Name casings'][(casings[sources] + 1) % len(pools['Name casings']),
+                                                     names[sources]]
+    return data
+
+
+def generate_dataset(path, rows, seed=0):
+    """Write `rows` synthetic admissions to the CSV `path`, CHUNK_ROWS at a time."""
+    pools = make_pools(seed)
+    for index, start in enumerate(range(0, rows, CHUNK_ROWS)):
+        rng = np.random.default_rng([seed, index + 1])
+        chunk = generate_chunk(rng, pools, min(CHUNK_ROWS, rows - start))
+        chunk.to_csv(path, index=False, mode='w' if index == 0 else 'a', header=index == 0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic healthcare dataset.")
+    parser.add_argument('--rows', type=int, default=55_500, help="Number of admissions to generate")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed gives the same file")
+    parser.add_argument('--output', default='healthcare_dataset.csv', help="CSV file to write")
+    args = parser.parse_args()
+
+    generate_dataset(args.output, args.rows, args.seed)
+    print(f"{args.rows} rows saved to {args.output}.")
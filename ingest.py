@@ -0,0 +1,68 @@
+import argparse
+
+import pandas as pd
+
+from cleaning import Deduplicator, RowHashSet, clean_chunk
+from data_store import (CLEANED_STORE_PATH, hash_index_path, next_batch_path, store_columns, store_parts, with_raw_dtypes,
+                        write_cleaned)
+from quantiles import QUANTILE_PATH, build_sketches, load_sketches, merge_sketches, write_sketches
+from rollups import ROLLUP_PATH, build_rollup, load_rollup, merge_rollups, write_rollup
+
+
+def validate_batch(batch, columns):
+    missing = [col for col in columns if col not in batch.columns]
+    extra = [col for col in batch.columns if col not in columns]
+    if missing or extra:
+        raise ValueError(f"Batch columns do not match the stored dataset (missing: {missing}, unexpected: {extra})")
+
+
+def ingest_batch(batch_path, store_path=CLEANED_STORE_PATH, rollup_path=ROLLUP_PATH, quantile_path=QUANTILE_PATH):
+    """Clean a new batch of admissions and append it to the cleaned store.
+
+    Only the batch is read: it is deduped against the stored row hash indexes, written
+    as a new store part with its own index, and merged into the rollup and the quantile
+    sketches (sketches are only kept up to date once Data_Clening.py has written them, since
+    a batch's own sketches would stand in for the whole store).
+    Returns the number of rows read, duplicates dropped and rows appended.
+    """
+    columns = store_columns(store_path)
+    # Read and typed like the raw file in clean_file: a blank Age must not turn the batch's ages
+    # into floats, and numbers must parse to the same values, or its rows wouldn't match the stored ones
+    batch = with_raw_dtypes(pd.read_csv(batch_path, dtype=str))
+    validate_batch(batch, columns)
+    batch = clean_chunk(batch[columns])
+
+    # Dedupe within the batch and against everything stored so far
+    stored = RowHashSet.load([hash_index_path(part) for part in store_parts(store_path)])
+    dedupe = Deduplicator(parts=stored.parts)
+    keep = dedupe.filter(batch)
+    new_rows = batch[keep]
+
+    if len(new_rows):
+        # Write the hash index before the part, so a stored part always has its index
+        part_path = next_batch_path(store_path)
+        dedupe.rows.save(hash_index_path(part_path))
+
+        rollup = build_rollup(new_rows)
+        stored_rollup = load_rollup(rollup_path)
+        if stored_rollup is not None:
+            rollup = merge_rollups(stored_rollup, rollup)
+        stored_sketches = load_sketches(quantile_path)
+
+        write_cleaned(new_rows, part_path)
+        if stored_sketches is not None:
+            write_sketches(merge_sketches(stored_sketches, build_sketches(new_rows)), quantile_path)
+        write_rollup(rollup, rollup_path)
+
+    return len(batch), int((~keep).sum()), len(new_rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Append a new batch of admissions to the cleaned dataset.")
+    parser.add_argument('batch', help="CSV file with the new admissions, in the raw dataset's format")
+    args = parser.parse_args()
+
+    rows, duplicates, appended = ingest_batch(args.batch)
+    print(f"Rows in batch: {rows}")
+    print(f"Number of duplicate rows: {duplicates}")
+    print(f"Rows appended to {CLEANED_STORE_PATH}: {appended}")
@@ -0,0 +1,77 @@
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Plotly figures built from server-side summaries: histogram bins and box-plot statistics are
+# computed with NumPy, so the figure's size no longer grows with the number of rows.
+
+
+def histogram_bins(values, nbins, weights=None):
+    # (bin centers, counts) of `nbins` equal-width bins; with `weights`, each value counts that many times
+    values = np.asarray(values, dtype='float64')
+    known = ~np.isnan(values)
+    counts, edges = np.histogram(values[known], bins=nbins, weights=None if weights is None else np.asarray(weights)[known])
+    return (edges[:-1] + edges[1:]) / 2, counts
+
+
+def box_stats(values):
+    """Quartiles, Tukey whiskers (furthest points within 1.5 IQR) and mean of `values`.
+
+    Quartiles use linear interpolation, like Plotly's default quartile method.
+    """
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': values[values >= q1 - 1.5 * iqr].min(),
+        'upperfence': values[values <= q3 + 1.5 * iqr].max(),
+        'mean': values.mean(),
+    }
+
+
+def summary_box(values, name, horizontal=False):
+    # A box trace drawn from precomputed statistics (outlier points are not sent)
+    stats = box_stats(values)
+    if stats is None:
+        return go.Box(name=name)
+    position = {'y': [name], 'orientation': 'h'} if horizontal else {'x': [name]}
+    return go.Box(name=name, boxpoints=False, **position, **{key: [value] for key, value in stats.items()})
+
+
+def histogram_figure(values, nbins, title, prebinned=True, weights=None):
+    """Histogram of `values` with a marginal box plot, like px.histogram(..., marginal='box').
+
+    `weights`, if given, are the number of rows each value stands for (the box plot is unweighted).
+    """
+    if not prebinned:
+        # Only needed for raw histograms; plotly.express is slow to import
+        import plotly.express as px
+
+        if weights is None:
+            return px.histogram(x=values, nbins=nbins, marginal='box', labels={'x': title})
+        return px.histogram(x=values, y=weights, histfunc='sum', nbins=nbins, marginal='box',
+                            labels={'x': title, 'y': 'count'})
+
+    centers, counts = histogram_bins(values, nbins, weights)
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02)
+    fig.add_trace(summary_box(values, title, horizontal=True), row=1, col=1)
+    fig.add_trace(go.Bar(x=centers, y=counts, name=title), row=2, col=1)
+    fig.update_yaxes(showticklabels=False, row=1, col=1)
+    fig.update_xaxes(title_text=title, row=2, col=1)
+    fig.update_yaxes(title_text="count", row=2, col=1)
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def box_figure(groups, prebinned=True):
+    """One box per entry of `groups` (name -> values), like px.box / go.Box on the raw values."""
+    fig = go.Figure()
+    for name, values in groups.items():
+        fig.add_trace(summary_box(values, name) if prebinned else go.Box(y=values, name=name))
+    return fig
@@ -0,0 +1,104 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+# Opt-in timing (and memory) spans. Code is instrumented with `with span(...)`; while no tracer
+# is active on the current thread, span() returns a shared no-op context manager.
+_local = threading.local()
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Tracer:
+    """Spans recorded on one thread, e.g. during one dashboard rerun.
+
+    With `memory` set, each span also records the growth of traced (Python and NumPy)
+    memory and its peak above the span's start. tracemalloc is process-wide and slows
+    everything down while it runs, so memory tracing is meant for one session at a time.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.spans = []
+        self._stack = []
+        self._origin = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        entry = {'name': name, 'depth': len(self._stack), 'args': args, 'peak': 0}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            entry['start_memory'] = current
+        self._stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._stack.pop()
+            record = {'name': name, 'depth': entry['depth'], 'start': start - self._origin, 'seconds': duration}
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, entry['peak'])
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+                record['allocated_mb'] = (current - entry['start_memory']) / 2**20
+                record['peak_mb'] = (peak - entry['start_memory']) / 2**20
+            record.update(args)
+            self.spans.append(record)
+
+    def table(self):
+        # Spans in start order, nested spans marked by their depth
+        frame = pd.DataFrame(sorted(self.spans, key=lambda record: record['start']))
+        if not frame.empty:
+            frame['name'] = ['· ' * depth + name for depth, name in zip(frame.pop('depth'), frame['name'])]
+        return frame
+
+    def to_json(self):
+        return json.dumps({'memory': self.memory, 'spans': self.spans}, indent=2, default=str)
+
+    def to_chrome_trace(self):
+        # Trace Event Format, for chrome://tracing or Perfetto
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [
+            {
+                'name': record['name'], 'ph': 'X', 'pid': pid, 'tid': tid,
+                'ts': record['start'] * 1e6, 'dur': record['seconds'] * 1e6,
+                'args': {key: value for key, value in record.items() if key not in ('name', 'start', 'seconds', 'depth')},
+            }
+            for record in self.spans
+        ]
+        return json.dumps({'traceEvents': events}, default=str)
+
+
+def start_tracing(memory=False):
+    """Start recording spans on the current thread, replacing any tracer left running."""
+    stop_tracing()
+    if memory:
+        tracemalloc.start()
+    _local.tracer = Tracer(memory)
+    return _local.tracer
+
+
+def stop_tracing():
+    # The tracer that was recording on this thread, if any
+    tracer = getattr(_local, 'tracer', None)
+    _local.tracer = None
+    if tracer is not None and tracer.memory:
+        tracemalloc.stop()
+    return tracer
+
+
+def span(name, **args):
+    """Context manager timing its block as `name` when tracing is on; extra `args` are recorded with it."""
+    tracer = getattr(_local, 'tracer', None)
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, **args)
@@ -0,0 +1,143 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from data_store import fill_and_strip
+from rollups import LENGTH_OF_STAY, length_of_stay, month_labels
+
+# Mergeable quantile sketches (DDSketch style) of the skewed measures, overall and per group.
+# A value x falls in the logarithmic bucket ceil(log_gamma |x|), and every value of a bucket is
+# within RELATIVE_ACCURACY of the bucket's representative value, so a sketch is just its
+# bucket counts. Counts add: sketches of disjoint chunks, batches or months merge exactly, like
+# rollups, and a quantile is read off the cumulative counts without touching raw rows.
+QUANTILE_PATH = 'cleaned_healthcare_quantiles.arrow'
+
+MEASURES = ['Billing Amount', LENGTH_OF_STAY]
+ALL = 'All'
+DIMENSIONS = [ALL, 'Medical Condition', 'Hospital', 'Month']
+QUANTILES = [0.5, 0.9, 0.99]
+KEYS = ['measure', 'dimension', 'group', 'key']
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+# Values smaller than this in magnitude (e.g. a same-day stay) share the zero bucket
+MIN_VALUE = 1e-3
+_MIN_BUCKET = int(np.ceil(np.log(MIN_VALUE) / np.log(GAMMA)))
+
+
+def bucket_keys(values):
+    """Signed bucket key of each value: 0 below MIN_VALUE in magnitude, otherwise the bucket
+    counted from MIN_VALUE's, negated for negative values, so keys sort like the values."""
+    values = np.asarray(values, dtype='float64')
+    magnitudes = np.abs(values)
+    buckets = np.ceil(np.log(np.maximum(magnitudes, MIN_VALUE)) / np.log(GAMMA)).astype('int64') - _MIN_BUCKET + 1
+    return np.where(magnitudes < MIN_VALUE, 0, np.sign(values).astype('int64') * buckets)
+
+
+def key_values(keys):
+    # Representative value of each bucket key, within RELATIVE_ACCURACY of all its values
+    keys = np.asarray(keys, dtype='int64')
+    exponents = np.abs(keys) + _MIN_BUCKET - 1
+    return np.where(keys == 0, 0.0, np.sign(keys) * 2 * GAMMA ** exponents / (GAMMA + 1))
+
+
+def group_labels(rows, dimension):
+    # Group of each row along a dimension, as text (months as 'YYYY-MM'); None if the column is missing
+    if dimension == ALL:
+        return np.full(len(rows), ALL, dtype=object)
+    if dimension == 'Month':
+        return np.asarray(month_labels(rows['Date of Admission']), dtype=object)
+    if dimension not in rows.columns:
+        return None
+    return fill_and_strip(rows[dimension]).astype(object).to_numpy()
+
+
+def build_sketches(data, weights=None):
+    """Sketches of every measure in MEASURES, overall and per group of every dimension.
+
+    One row per measure, dimension, group and bucket `key` with the `count` of values in the
+    bucket (the summed `weights` of weighted rows, e.g. a sampled preview's). Rows without a
+    valid, non-negative length of stay are left out, as in the rollup.
+    """
+    los = data[LENGTH_OF_STAY] if LENGTH_OF_STAY in data.columns else length_of_stay(data)
+    valid = (los >= 0).to_numpy()
+    rows = data[valid]
+    counts = np.ones(len(rows), dtype='int64') if weights is None else np.asarray(weights, dtype='float64')[valid]
+    labels = {dimension: group_labels(rows, dimension) for dimension in DIMENSIONS}
+
+    tables = []
+    for measure in MEASURES:
+        if measure == LENGTH_OF_STAY:
+            values = los[valid].to_numpy(dtype='float64', na_value=np.nan)
+        elif measure in rows.columns:
+            values = rows[measure].to_numpy(dtype='float64', na_value=np.nan)
+        else:
+            continue
+        present = ~np.isnan(values)
+        keys = bucket_keys(values[present])
+        for dimension, groups in labels.items():
+            if groups is None:
+                continue
+            table = pd.DataFrame({'group': groups[present], 'key': keys, 'count': counts[present]})
+            table = table.groupby(['group', 'key'], sort=False)['count'].sum().reset_index()
+            table.insert(0, 'dimension', dimension)
+            table.insert(0, 'measure', measure)
+            tables.append(table)
+    return aggregate(tables)
+
+
+def aggregate(tables):
+    frame = pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(
+        {'measure': [], 'dimension': [], 'group': [], 'key': [], 'count': []})
+    sketches = frame.groupby(KEYS, sort=False)['count'].sum().reset_index()
+    sketches['key'] = sketches['key'].astype('int32')
+    for col in ['measure', 'dimension', 'group']:
+        sketches[col] = sketches[col].astype('category')
+    return sketches
+
+
+def merge_sketches(*sketches):
+    # Bucket counts add, so sketches of disjoint row sets merge exactly
+    return aggregate([table.astype({col: object for col in ['measure', 'dimension', 'group']}) for table in sketches])
+
+
+def quantile_label(q):
+    # 0.5 -> 'p50', 0.99 -> 'p99'
+    return f'p{q * 100:g}'
+
+
+def sketch_quantiles(sketches, measure, dimension=ALL, quantiles=QUANTILES):
+    """Quantiles of `measure` per group of `dimension`, read from the sketches.
+
+    One row per group (sorted by group), with its `count` and a 'p50'-style column per
+    quantile. The q-quantile is the value of rank q * (count - 1), within RELATIVE_ACCURACY.
+    """
+    table = sketches[(sketches['measure'] == measure) & (sketches['dimension'] == dimension)]
+    table = pd.DataFrame({'group': table['group'].astype(object).to_numpy(), 'key': table['key'].to_numpy(),
+                          'count': table['count'].to_numpy()}).sort_values(['group', 'key'], kind='stable')
+    totals = table.groupby('group')['count'].sum()
+    cumulative = table.groupby('group', sort=False)['count'].cumsum().to_numpy()
+    row_totals = totals.reindex(table['group']).to_numpy()
+
+    result = pd.DataFrame({'count': totals})
+    for q in quantiles:
+        # First bucket of each group whose cumulative count passes the quantile's rank
+        passed = cumulative > q * (row_totals - 1)
+        values = pd.Series(key_values(table['key'].to_numpy()[passed]), index=table['group'].to_numpy()[passed])
+        result[quantile_label(q)] = values.groupby(level=0).first()
+    result.index.name = dimension
+    return result
+
+
+def write_sketches(sketches, path=QUANTILE_PATH):
+    tmp_path = f"{path}.tmp"
+    feather.write_feather(sketches, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def load_sketches(path=QUANTILE_PATH):
+    if not os.path.exists(path):
+        return None
+    return feather.read_feather(path, memory_map=True)
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# Columns with at most this many categories get one precomputed bitmap per category; others keep
+# posting lists (row positions grouped by category) and build their bitmaps per query.
+BITMAP_MAX_CATEGORIES = 64
+
+
+class FilterIndex:
+    """Row-position indexes over a patient frame, built once and combined as bitmaps.
+
+    Range columns (e.g. admission date, age) are kept sorted with their row positions, so a
+    range is two binary searches; missing values are left out, so no range matches them. Category columns map each category to a packed bitmap of
+    its rows (1 bit per row). Filters on several columns are intersected bitmap-wise instead
+    of re-scanning the frame.
+    """
+
+    def __init__(self, data, range_columns=(), category_columns=()):
+        self.size = len(data)
+
+        self.ranges = {}
+        for col in range_columns:
+            present = data[col].notna().to_numpy()
+            positions = np.flatnonzero(present)
+            values = data[col].to_numpy()[present]
+            order = np.argsort(values, kind='stable')
+            self.ranges[col] = (values[order], positions[order])
+
+        self.categories = {}
+        self.bitmaps = {}
+        self.postings = {}
+        for col in category_columns:
+            series = data[col] if isinstance(data[col].dtype, pd.CategoricalDtype) else data[col].astype('category')
+            codes = series.cat.codes.to_numpy()
+            self.categories[col] = series.cat.categories
+            if len(series.cat.categories) <= BITMAP_MAX_CATEGORIES:
+                self.bitmaps[col] = [np.packbits(codes == code) for code in range(len(series.cat.categories))]
+            else:
+                order = np.argsort(codes, kind='stable')
+                offsets = np.searchsorted(codes[order], np.arange(len(series.cat.categories) + 1))
+                self.postings[col] = (order, offsets)
+
+    def bounds(self, col):
+        # (smallest, largest) value of a range column, None if it has no values
+        values, _ = self.ranges[col]
+        if not len(values):
+            return None
+        return values[0], values[-1]
+
+    def values(self, col):
+        return list(self.categories[col])
+
+    def _bitmap(self, positions):
+        mask = np.zeros(self.size, dtype=bool)
+        mask[positions] = True
+        return np.packbits(mask)
+
+    def range_bitmap(self, col, low, high):
+        # Rows with low <= value <= high
+        values, order = self.ranges[col]
+        if np.issubdtype(values.dtype, np.datetime64):
+            low, high = pd.Timestamp(low).to_datetime64(), pd.Timestamp(high).to_datetime64()
+        start = np.searchsorted(values, low, side='left')
+        stop = np.searchsorted(values, high, side='right')
+        return self._bitmap(order[start:stop])
+
+    def category_bitmap(self, col, selected):
+        # Rows whose value is any of `selected`
+        codes = [code for code in self.categories[col].get_indexer(list(selected)) if code >= 0]
+        if col in self.bitmaps:
+            if not codes:
+                return self._bitmap([])
+            return np.bitwise_or.reduce([self.bitmaps[col][code] for code in codes])
+        order, offsets = self.postings[col]
+        positions = [order[offsets[code]:offsets[code + 1]] for code in codes]
+        return self._bitmap(np.concatenate(positions) if positions else [])
+
+    def select(self, ranges=None, categories=None):
+        """Row positions matching every filter, or None when no filter is given.
+
+        `ranges` maps a range column to an inclusive (low, high) pair and `categories`
+        maps a category column to the values to keep.
+        """
+        bitmaps = [self.range_bitmap(col, low, high) for col, (low, high) in (ranges or {}).items()]
+        bitmaps += [self.category_bitmap(col, selected) for col, selected in (categories or {}).items()]
+        if not bitmaps:
+            return None
+        combined = np.bitwise_and.reduce(bitmaps)
+        return np.flatnonzero(np.unpackbits(combined, count=self.size))
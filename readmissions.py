@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from data_store import normalize_categories
+
+# Readmissions: a stay is readmitted when the same patient is admitted again within a window of
+# days after its discharge. Patients are matched on their title-cased Name, Age and Gender (as
+# Data_Clening.py normalizes names). Rows are sorted once by patient and admission date, so each
+# patient's stays are adjacent and the gap to the next stay is a vectorized shift.
+READMISSION_WINDOW = 30
+PATIENT_COLUMNS = ['Name', 'Age', 'Gender']
+
+
+class PatientIndex:
+    """Row positions of a patient frame sorted by patient key and Date of Admission.
+
+    `later_stay[i]` tells whether sorted row i is a later stay of the patient of sorted row
+    i - 1. Built in O(n log n) once; readmission queries are then O(n) for any window.
+    """
+
+    def __init__(self, data):
+        names = normalize_categories(data['Name'], lambda categories: categories.str.strip().str.title())
+        names = names.cat.codes.to_numpy()
+        ages = data['Age'].to_numpy(dtype='float64', na_value=np.nan)
+        genders = normalize_categories(data['Gender'], lambda categories: categories.str.strip()).cat.codes.to_numpy()
+        admissions = data['Date of Admission'].to_numpy().astype('datetime64[D]')
+
+        # Last key first: patient (name, age, gender), then admission date
+        self.order = np.lexsort((admissions, genders, ages, names))
+        names, ages, genders = names[self.order], ages[self.order], genders[self.order]
+        self.admissions = admissions[self.order]
+        self.discharges = data['Discharge Date'].to_numpy().astype('datetime64[D]')[self.order]
+
+        # Rows without a name, or with a missing age or gender, are never linked
+        self.later_stay = np.zeros(len(self.order), dtype=bool)
+        self.later_stay[1:] = ((names[1:] == names[:-1]) & (ages[1:] == ages[:-1]) & (genders[1:] == genders[:-1])
+                               & (names[1:] >= 0) & (genders[1:] >= 0))
+
+    def days_to_next_stay(self):
+        # Per sorted row: days from its discharge to the patient's next admission (NaN for a last stay)
+        gaps = np.full(len(self.order), np.nan)
+        later = np.flatnonzero(self.later_stay)
+        gaps[later - 1] = (self.admissions[later] - self.discharges[later - 1]).astype('float64')
+        return gaps
+
+    def readmitted(self, window=READMISSION_WINDOW):
+        """Per row of the indexed frame (in its own order): whether the patient was admitted again
+        within `window` days of the stay's discharge. Overlapping stays don't count."""
+        gaps = self.days_to_next_stay()
+        flags = np.zeros(len(self.order), dtype=bool)
+        flags[self.order] = (gaps >= 0) & (gaps <= window)
+        return flags
+
+    def readmissions(self, data, window=READMISSION_WINDOW, columns=('Medical Condition', 'Hospital')):
+        """One row per readmission: the patient, the first stay's discharge, `columns` of both stays
+        and the days between them, in patient order."""
+        gaps = self.days_to_next_stay()
+        first = np.flatnonzero((gaps >= 0) & (gaps <= window))
+        stays, readmissions = self.order[first], self.order[first + 1]
+        columns = [col for col in columns if col in data.columns]
+        pairs = {col: data[col].to_numpy()[stays] for col in PATIENT_COLUMNS}
+        pairs['Discharge Date'] = data['Discharge Date'].to_numpy()[stays]
+        pairs['Readmission Date'] = data['Date of Admission'].to_numpy()[readmissions]
+        pairs['Days to Readmission'] = gaps[first].astype('int64')
+        for col in columns:
+            pairs[col] = data[col].to_numpy()[stays]
+            pairs[f'Readmission {col}'] = data[col].to_numpy()[readmissions]
+        return pd.DataFrame(pairs)
+
+
+def readmission_rates(data, readmitted, by):
+    """Stays, readmitted stays and the readmission rate per `by` group (of the first stay)."""
+    grouped = pd.Series(readmitted, index=data.index).groupby(data[by], observed=True)
+    return pd.DataFrame({'stays': grouped.size(), 'readmissions': grouped.sum(), 'rate': grouped.mean()})
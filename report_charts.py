@@ -0,0 +1,140 @@
+import seaborn as sns
+import matplotlib.pyplot as plt
+
+# Each chart takes the precomputed metric from analytics.py and returns a new figure
+
+
+def age_distribution(age_histogram):
+    age_counts, age_bins = age_histogram
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.histplot(x=(age_bins[:-1] + age_bins[1:]) / 2, weights=age_counts, bins=len(age_counts),
+                 binrange=(age_bins[0], age_bins[-1]), kde=True, color='skyblue', ax=ax)
+    ax.set_title('Age Distribution of Patients', fontsize=16)
+    ax.set_xlabel('Age', fontsize=12)
+    ax.set_ylabel('Frequency', fontsize=12)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    return fig
+
+
+def gender_distribution(gender_counts):
+    fig, ax = plt.subplots(figsize=(6, 6))
+    sns.barplot(x=gender_counts.index, y=gender_counts.values, order=gender_counts.index, palette='pastel', ax=ax)
+    ax.set_title('Gender Distribution', fontsize=16)
+    ax.set_xlabel('Gender', fontsize=12)
+    ax.set_ylabel('Count', fontsize=12)
+    return fig
+
+
+def top_conditions(condition_counts):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sns.barplot(y=condition_counts.index, x=condition_counts.values, order=condition_counts.index,
+                palette='coolwarm', ax=ax)
+    ax.set_title(f'Top {len(condition_counts)} Medical Conditions', fontsize=16)
+    ax.set_xlabel('Count', fontsize=12)
+    ax.set_ylabel('Medical Condition', fontsize=12)
+    return fig
+
+
+def admission_trends(yearly_admissions):
+    fig, ax = plt.subplots(figsize=(14, 6))
+    sns.lineplot(x=yearly_admissions.index, y=yearly_admissions.values, marker='o', color='teal', ax=ax)
+    ax.set_title('Admission Trends Over the Years', fontsize=16)
+    ax.set_xlabel('Year', fontsize=12)
+    ax.set_ylabel('Number of Admissions', fontsize=12)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    return fig
+
+
+def length_of_stay(los_histogram):
+    los_counts, los_bins = los_histogram
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.histplot(x=(los_bins[:-1] + los_bins[1:]) / 2, weights=los_counts, bins=len(los_counts),
+                 binrange=(los_bins[0], los_bins[-1]), kde=True, color='coral', ax=ax)
+    ax.set_title('Length of Hospital Stays', fontsize=16)
+    ax.set_xlabel('Days', fontsize=12)
+    ax.set_ylabel('Frequency', fontsize=12)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    return fig
+
+
+def admission_types(admission_counts):
+    fig, ax = plt.subplots(figsize=(8, 6))
+    sns.barplot(x=admission_counts.index, y=admission_counts.values, order=admission_counts.index,
+                palette='viridis', ax=ax)
+    ax.set_title('Admission Types', fontsize=16)
+    ax.set_xlabel('Admission Type', fontsize=12)
+    ax.set_ylabel('Count', fontsize=12)
+    return fig
+
+
+def avg_billing(billing):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sns.barplot(y=billing.index, x=billing.values, order=billing.index, palette='magma', ax=ax)
+    ax.set_title(f'Top {len(billing)} Medical Conditions by Average Billing Amount', fontsize=16)
+    ax.set_xlabel('Average Billing Amount (USD)', fontsize=12)
+    ax.set_ylabel('Medical Condition', fontsize=12)
+    return fig
+
+
+def billing_quantiles(quantiles):
+    # Median, p90 and p99 side by side per condition
+    columns = [col for col in quantiles.columns if col.startswith('p')]
+    long = quantiles[columns].rename_axis('group').reset_index().melt('group', var_name='Quantile', value_name='value')
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sns.barplot(data=long, y='group', x='value', hue='Quantile', order=quantiles.index, palette='magma', ax=ax)
+    ax.set_title('Billing Amount Quantiles by Medical Condition', fontsize=16)
+    ax.set_xlabel('Billing Amount (USD)', fontsize=12)
+    ax.set_ylabel('Medical Condition', fontsize=12)
+    return fig
+
+
+def top_medications(medication_counts):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.barplot(y=medication_counts.index, x=medication_counts.values, order=medication_counts.index,
+                palette='cubehelix', ax=ax)
+    ax.set_title(f'Top {len(medication_counts)} Medications', fontsize=16)
+    ax.set_xlabel('Count', fontsize=12)
+    ax.set_ylabel('Medication', fontsize=12)
+    return fig
+
+
+def readmission_chart(rates, by):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sns.barplot(y=rates.index.astype(str), x=rates['rate'].values * 100, order=rates.index.astype(str),
+                palette='rocket', ax=ax)
+    ax.set_title(f'Readmission Rate by {by}', fontsize=16)
+    ax.set_xlabel('Readmitted Stays (%)', fontsize=12)
+    ax.set_ylabel(by, fontsize=12)
+    return fig
+
+
+def readmission_by_condition(rates):
+    return readmission_chart(rates, 'Medical Condition')
+
+
+def readmission_by_hospital(rates):
+    return readmission_chart(rates, 'Hospital')
+
+
+# Chart name -> (metric it is drawn from, chart function), grouped by report
+CHARTS = {
+    'demographic': {
+        'age_distribution': ('age_histogram', age_distribution),
+        'gender_distribution': ('gender_counts', gender_distribution),
+        'top_conditions': ('top_conditions', top_conditions),
+    },
+    'timeline': {
+        'admission_trends': ('yearly_admissions', admission_trends),
+        'length_of_stay': ('los_histogram', length_of_stay),
+    },
+    'treatment': {
+        'admission_types': ('admission_type_counts', admission_types),
+        'avg_billing': ('avg_billing_by_condition', avg_billing),
+        'billing_quantiles': ('billing_quantiles_by_condition', billing_quantiles),
+        'top_medications': ('top_medications', top_medications),
+    },
+    'readmission': {
+        'rates_by_condition': ('readmission_by_condition', readmission_by_condition),
+        'rates_by_hospital': ('readmission_by_hospital', readmission_by_hospital),
+    },
+}
@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from data_store import fill_and_strip
+
+ROLLUP_PATH = 'cleaned_healthcare_rollup.arrow'
+
+LENGTH_OF_STAY = 'Length of Stay (Days)'
+DIMENSIONS = ['Medical Condition', 'Medication', 'Gender', 'Admission Type', 'Month']
+MEASURES = [LENGTH_OF_STAY, 'Age', 'Billing Amount']
+
+
+def length_of_stay(data):
+    return (data['Discharge Date'] - data['Date of Admission']).dt.days
+
+
+def build_rollup(data):
+    """Aggregate patient rows to one row per Condition x Medication x Gender x Admission Type x month.
+
+    Each group keeps its row `count` and, per measure, the non-null count (`n`), `sum`
+    and `sumsq`, so means and variances can be derived and rollups can be merged.
+    Rows without a valid, non-negative length of stay are left out, as in the dashboard.
+    """
+    los = data[LENGTH_OF_STAY] if LENGTH_OF_STAY in data.columns else length_of_stay(data)
+    valid = (los >= 0).to_numpy()
+    rows = data[valid]
+
+    frame = pd.DataFrame(index=rows.index)
+    for col in DIMENSIONS[:-1]:
+        frame[col] = fill_and_strip(rows[col]) if col in rows.columns else "Unknown"
+    frame['Month'] = rows['Date of Admission'].to_numpy().astype('datetime64[M]').astype('datetime64[ns]')
+
+    frame['count'] = 1
+    for measure in MEASURES:
+        if measure == LENGTH_OF_STAY:
+            values = los[valid].astype('float64')
+        elif measure in rows.columns:
+            values = rows[measure].astype('float64')
+        else:
+            values = pd.Series(np.nan, index=rows.index)
+        frame[f'{measure} n'] = values.notna().astype('int64')
+        frame[f'{measure} sum'] = values.fillna(0)
+        frame[f'{measure} sumsq'] = values.fillna(0) ** 2
+
+    return aggregate(frame)
+
+
+def aggregate(frame):
+    cube = frame.groupby(DIMENSIONS, observed=True, dropna=False, sort=False).sum().reset_index()
+    for col in DIMENSIONS[:-1]:
+        cube[col] = cube[col].astype('category')
+    return cube
+
+
+def merge_rollups(*cubes):
+    # Counts and sums add, so rollups of disjoint row sets merge exactly
+    frame = pd.concat([cube.astype({col: object for col in DIMENSIONS[:-1]}) for cube in cubes],
+                      ignore_index=True)
+    return aggregate(frame)
+
+
+def rollup_counts(cube, by):
+    # Equivalent of data[by].value_counts()
+    return cube.groupby(by, observed=True)['count'].sum().sort_values(ascending=False)
+
+
+def rollup_sums(cube, measure, by=None):
+    columns = [f'{measure} n', f'{measure} sum', f'{measure} sumsq']
+    if by is None:
+        return cube[columns].sum()
+    return cube.groupby(by, observed=True)[columns].sum()
+
+
+def rollup_mean(cube, measure, by=None):
+    # Equivalent of data.groupby(by)[measure].mean() (or data[measure].mean() without `by`)
+    sums = rollup_sums(cube, measure, by)
+    return sums[f'{measure} sum'] / sums[f'{measure} n']
+
+
+def rollup_variance(cube, measure, by=None):
+    # Sample variance (ddof=1), like pandas' var()
+    sums = rollup_sums(cube, measure, by)
+    n = sums[f'{measure} n']
+    return (sums[f'{measure} sumsq'] - sums[f'{measure} sum'] ** 2 / n) / (n - 1)
+
+
+def month_labels(index):
+    # 'YYYY-MM', matching str() of a monthly Period. Only the distinct months are formatted
+    # (strftime runs per value) and mapped back to the rows; missing dates stay missing
+    months = pd.DatetimeIndex(index).to_numpy().astype('datetime64[M]')
+    codes, uniques = pd.factorize(months)
+    labels = np.append(pd.DatetimeIndex(uniques).strftime('%Y-%m').to_numpy(dtype=object), np.nan)
+    return pd.Index(labels[codes], dtype=object)
+
+
+def write_rollup(cube, path=ROLLUP_PATH):
+    tmp_path = f"{path}.tmp"
+    feather.write_feather(cube, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def load_rollup(path=ROLLUP_PATH):
+    if not os.path.exists(path):
+        return None
+    return feather.read_feather(path, memory_map=True)
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from data_store import fill_and_strip
+from quantiles import build_sketches
+from rollups import build_rollup, rollup_variance
+from timeseries import bucket_keys, bucket_starts, daily_series, over_time, resample
+
+# Sampled previews of a patient frame. Rows are stratified by Medical Condition and admission
+# month and every stratum keeps the same fraction of its rows (at least one), so a sample row
+# stands for (stratum rows / stratum sample) rows. Counts and sums are scaled by that weight;
+# 95% confidence intervals come from the stratified-sampling variance of each estimate.
+PREVIEW_ROWS = 50_000
+Z = 1.96
+STRATA = ['Medical Condition', 'Month']
+
+
+def strata_keys(data):
+    # (Medical Condition, admission month) of each row, as the rollup groups them
+    return pd.MultiIndex.from_arrays([
+        fill_and_strip(data['Medical Condition']).astype(object).to_numpy(),
+        data['Date of Admission'].to_numpy().astype('datetime64[M]').astype('datetime64[ns]'),
+    ], names=STRATA)
+
+
+def split_variance(m, N, n):
+    # Variance of the estimate N * m / n of a stratum's rows in some group, from the m of its n
+    # sampled rows (out of N) that fall in the group; 0 when the stratum lies wholly in or out of it
+    share = m / n
+    return (N ** 2 * (1 - n / N) * share * (1 - share) / (n - 1).where(n > 1)).fillna(0)
+
+
+def stratified_sample(data, rows=PREVIEW_ROWS, seed=0):
+    """Row positions of a stratified random sample of about `rows` rows of `data`, and the
+    strata: their sizes ('rows') and sample sizes ('sample'), indexed by STRATA."""
+    keys = strata_keys(data)
+    codes, uniques = keys.factorize()
+    sizes = np.bincount(codes, minlength=len(uniques))
+    fraction = min(rows / len(data), 1.0) if len(data) else 1.0
+    kept = np.minimum(np.maximum(np.round(sizes * fraction), 1), sizes).astype('int64')
+
+    # Shuffle within each stratum, then keep the first `kept` rows of each
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(codes)), codes))
+    starts = np.cumsum(sizes) - sizes
+    ranks = np.arange(len(order)) - starts[codes[order]]
+    positions = np.sort(order[ranks < kept[codes[order]]])
+
+    strata = pd.DataFrame({'rows': sizes, 'sample': kept}, index=uniques.set_names(STRATA))
+    return positions, strata
+
+
+class Preview:
+    """A weighted stratified sample of a patient frame, with the estimates the dashboard draws.
+
+    `data` holds the sampled rows, `weights` the rows each one stands for, `rollup` a rollup of
+    the sample whose counts and sums are scaled by those weights (so the rollup helpers give
+    full-data estimates), `daily` a weighted daily_series and `sketches` weighted quantile
+    sketches. A preview of a subset of the
+    sample (e.g. the rows matching some filters) keeps the original strata.
+    """
+
+    def __init__(self, data, strata):
+        self.data = data
+        self.strata = strata
+        self.fraction = strata['sample'].sum() / strata['rows'].sum() if len(strata) else 1.0
+        self.weights = (strata['rows'] / strata['sample']).reindex(strata_keys(data)).to_numpy()
+        self.rollup = self._weighted_rollup()
+        self.daily = daily_series(data, weights=self.weights)
+        self.sketches = build_sketches(data, weights=self.weights)
+
+    @classmethod
+    def sample(cls, data, rows=PREVIEW_ROWS, seed=0):
+        positions, strata = stratified_sample(data, rows, seed)
+        return cls(data.take(positions), strata)
+
+    def subset(self, positions):
+        # Preview of the sample rows at `positions`
+        return Preview(self.data.take(positions), self.strata)
+
+    def _weighted_rollup(self):
+        cube = build_rollup(self.data)
+        strata = self.strata.reindex(pd.MultiIndex.from_arrays(
+            [cube['Medical Condition'].astype(object).to_numpy(), cube['Month'].to_numpy()], names=STRATA))
+        weights = (strata['rows'] / strata['sample']).to_numpy()
+        cube['sample count'] = cube['count']
+        cube['stratum rows'] = strata['rows'].to_numpy()
+        cube['stratum sample'] = strata['sample'].to_numpy()
+        cube['weight'] = weights
+        scaled = ['count'] + [col for col in cube.columns if col.endswith((' n', ' sum', ' sumsq'))]
+        cube[scaled] = cube[scaled].mul(weights, axis=0)
+        return cube
+
+    def count_errors(self, by=None, where=None):
+        """95% interval half-widths of rollup_counts(self.rollup, by), or of the total count
+        without `by`. `where` optionally selects the rollup rows counted (a boolean mask).
+
+        Counts of a stratum are known exactly, so only the split of each stratum's rows
+        between groups (and in or out of `where`) is uncertain.
+        """
+        rollup = self.rollup if where is None else self.rollup[where]
+        keys = STRATA if by is None else list(dict.fromkeys([by] + STRATA))
+        per_stratum = rollup.groupby(keys, observed=True).agg(
+            m=('sample count', 'sum'), N=('stratum rows', 'first'), n=('stratum sample', 'first'))
+        variance = split_variance(per_stratum['m'], per_stratum['N'], per_stratum['n'])
+        if by is None:
+            return Z * np.sqrt(variance.sum())
+        return Z * np.sqrt(variance.groupby(level=by, observed=True).sum())
+
+    def mean_errors(self, measure, by=None):
+        """95% interval half-widths of rollup_mean(self.rollup, measure, by)."""
+        sampled = (self.rollup[f'{measure} n'] / self.rollup['weight']).rename('sampled')
+        sampled = sampled.sum() if by is None else sampled.groupby(self.rollup[by], observed=True).sum()
+        standard_error = np.sqrt(rollup_variance(self.rollup, measure, by) * (1 - self.fraction) / sampled)
+        return Z * standard_error
+
+    def over_time(self, granularity, window=1):
+        """timeseries.over_time of the weighted daily series. Without a rolling window, 95% interval
+        half-widths are added as 'admissions error' and 'avg los error'. A bucket's admissions are
+        only uncertain in the strata it cuts across, so months and years of the full sample are
+        exact and get no 'admissions error' (missing where a bucket's count is exact)."""
+        series = over_time(self.daily, granularity, window)
+        if window > 1:
+            return series
+        errors = self.admission_errors(granularity).reindex(series.index, fill_value=0)
+        if (errors > 0).any():
+            series['admissions error'] = errors.where(errors > 0)
+        # The sample's own length-of-stay spread per bucket
+        sampled = resample(daily_series(self.data), granularity).reindex(series.index, fill_value=0)
+        if 'los n' in sampled.columns:
+            n = sampled['los n'].where(sampled['los n'] > 1)
+            variance = (sampled['los sumsq'] - sampled['los sum'] ** 2 / n) / (n - 1)
+            series['avg los error'] = Z * np.sqrt(variance * (1 - self.fraction) / n)
+        return series
+
+    def admission_errors(self, granularity):
+        # 95% interval half-widths of the weighted admissions per `granularity` bucket, summed
+        # per stratum over the split of its sampled rows across buckets
+        days = self.data['Date of Admission'].to_numpy().astype('datetime64[D]')
+        valid = ~np.isnat(days)
+        keys = strata_keys(self.data)[valid]
+        strata = self.strata.reindex(keys)
+        rows = pd.DataFrame({'bucket': bucket_keys(days[valid].astype('int64'), granularity),
+                             'stratum': keys.factorize()[0],
+                             'N': strata['rows'].to_numpy(), 'n': strata['sample'].to_numpy()})
+        per_stratum = rows.groupby(['bucket', 'stratum']).agg(
+            m=('N', 'size'), N=('N', 'first'), n=('n', 'first'))
+        variance = split_variance(per_stratum['m'], per_stratum['N'], per_stratum['n'])
+        errors = Z * np.sqrt(variance.groupby(level='bucket').sum())
+        errors.index = bucket_starts(errors.index.to_numpy(), granularity)
+        return errors
+
+def with_error(value, error, fmt='{:,.1f}'):
+    # "value ± error", or just the value when it is exact (full data, or a count known from the strata)
+    return fmt.format(value) if not error else f"{fmt.format(value)} ± {fmt.format(error)}"
@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from data_store import CLEANED_STORE_PATH, store_parts
+from rollups import LENGTH_OF_STAY, length_of_stay
+
+# Parallel versions of the analysis scripts' aggregations. The store is split into row ranges
+# (shards) that worker processes read memory-mapped; each worker returns small partial
+# aggregates, which merge exactly: value counts and the count/sum/sumsq/min/max of a measure
+# per group add up (or take the min/max) across shards.
+
+# Columns derived from stored ones, and the columns they need
+DERIVED_COLUMNS = {
+    'Year': ['Date of Admission'],
+    LENGTH_OF_STAY: ['Date of Admission', 'Discharge Date'],
+}
+SHARDS_PER_WORKER = 2
+
+
+def shard_store(shards, path=CLEANED_STORE_PATH):
+    """Split every part of the store into about `shards` row ranges in total: (part, start, stop)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found; run Data_Clening.py first")
+    sizes = {}
+    for part in store_parts(path):
+        with pa.memory_map(part) as source:
+            reader = pa.ipc.open_file(source)
+            sizes[part] = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    rows_per_shard = max(-(-sum(sizes.values()) // shards), 1)
+    return [(part, start, min(start + rows_per_shard, size))
+            for part, size in sizes.items() for start in range(0, size, rows_per_shard)]
+
+
+def read_shard(shard, columns):
+    part, start, stop = shard
+    stored = list(dict.fromkeys(base for col in columns for base in DERIVED_COLUMNS.get(col, [col])))
+    table = feather.read_table(part, columns=stored, memory_map=True)
+    data = table.slice(start, stop - start).to_pandas()
+    if 'Year' in columns:
+        data['Year'] = data['Date of Admission'].dt.year
+    if LENGTH_OF_STAY in columns:
+        data[LENGTH_OF_STAY] = length_of_stay(data)
+    return data
+
+
+def object_index(result):
+    # Plain index instead of a categorical one, so partials with different dictionaries align
+    if isinstance(result.index, pd.CategoricalIndex):
+        result.index = result.index.astype(object)
+    return result
+
+
+def partial_aggregates(shard, counts, stats):
+    """Runs in a worker: value counts of each `counts` column and the per-group
+    count/sum/sumsq/min/max of each (group column, measure) in `stats`, for one shard."""
+    columns = list(dict.fromkeys(list(counts) + [col for pair in stats for col in pair]))
+    data = read_shard(shard, columns)
+    partial_counts = {col: object_index(data[col].value_counts()) for col in counts}
+    partial_stats = {}
+    for by, measure in stats:
+        values = data[measure].astype('float64')
+        grouped = pd.DataFrame({by: data[by], 'value': values, 'square': values ** 2}).groupby(by, observed=True)
+        partial_stats[by, measure] = object_index(pd.DataFrame({
+            'count': grouped['value'].count(),
+            'sum': grouped['value'].sum(),
+            'sumsq': grouped['square'].sum(),
+            'min': grouped['value'].min(),
+            'max': grouped['value'].max(),
+        }))
+    return partial_counts, partial_stats
+
+
+def merge_partials(partials):
+    counts, stats = {}, {}
+    for partial_counts, partial_stats in partials:
+        for col, values in partial_counts.items():
+            counts[col] = values if col not in counts else counts[col].add(values, fill_value=0).astype('int64')
+        for key, frame in partial_stats.items():
+            stats.setdefault(key, []).append(frame)
+    for key, frames in stats.items():
+        combined = pd.concat(frames).groupby(level=0)
+        stats[key] = combined[['count', 'sum', 'sumsq']].sum().join(combined['min'].min()).join(combined['max'].max())
+    return counts, stats
+
+
+def aggregate_store(counts=(), stats=(), workers=None, path=CLEANED_STORE_PATH):
+    """Value counts of the `counts` columns and per-group statistics of the (group, measure)
+    pairs in `stats`, over the whole store, computed by a pool of `workers` processes
+    (one per core by default). Returns ({column: counts}, {(group, measure): statistics})."""
+    workers = workers or os.cpu_count()
+    shards = shard_store(workers * SHARDS_PER_WORKER, path)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = list(pool.map(partial_aggregates, shards, [counts] * len(shards), [stats] * len(shards)))
+    return merge_partials(partials)
+
+
+def sorted_counts(counts):
+    # Largest first, like value_counts()
+    return counts.sort_values(ascending=False, kind='stable')
+
+
+def histogram_from_counts(counts, bins):
+    # np.histogram of the values counted in `counts`: same edges and counts as on the raw values
+    hist, edges = np.histogram(counts.index.to_numpy(dtype='float64'), bins=bins,
+                               weights=counts.to_numpy(dtype='float64'))
+    return hist.astype('int64'), edges
+
+
+def treatment_metrics(workers=None, path=CLEANED_STORE_PATH, n=10):
+    """Treatment_Analysis.py's metrics, as analytics computes them, from a parallel pass."""
+    counts, stats = aggregate_store(['Admission Type', 'Medication'], [('Medical Condition', 'Billing Amount')],
+                                    workers, path)
+    billing = stats['Medical Condition', 'Billing Amount']
+    return {
+        'admission_type_counts': sorted_counts(counts['Admission Type']),
+        'avg_billing_by_condition': (billing['sum'] / billing['count']).sort_values(ascending=False).head(n),
+        'top_medications': sorted_counts(counts['Medication']).head(n),
+    }
+
+
+def timeline_metrics(workers=None, path=CLEANED_STORE_PATH, bins=30):
+    """Timeline_Analysis.py's metrics, as analytics computes them, from a parallel pass."""
+    counts, _ = aggregate_store(['Year', LENGTH_OF_STAY], workers=workers, path=path)
+    return {
+        'yearly_admissions': counts['Year'].sort_index(),
+        'los_histogram': histogram_from_counts(counts[LENGTH_OF_STAY], bins),
+    }
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from cleaning import clean_file
+from generate_data import generate_dataset
+from ingest import ingest_batch
+
+
+def test_blank_age_in_batch_still_matches_stored_rows(tmp_path):
+    # A batch whose Age column would be read as float (one blank value) must still dedupe
+    # against the rows stored with integer ages
+    raw_path, batch_path = tmp_path / 'raw.csv', tmp_path / 'batch.csv'
+    store_path = str(tmp_path / 'store.arrow')
+    generate_dataset(str(raw_path), 2000, 0)
+    clean_file(str(raw_path), store_path=store_path, rollup_path=str(tmp_path / 'rollup.arrow'))
+
+    raw = pd.read_csv(raw_path, dtype=str, keep_default_na=False)
+    new = raw.head(100).copy()
+    new['Room Number'] = [str(1000 + i) for i in range(len(new))]
+    new.loc[new.index[0], 'Age'] = ''
+    pd.concat([raw, new], ignore_index=True).to_csv(batch_path, index=False)
+
+    rows, duplicates, appended = ingest_batch(str(batch_path), store_path, str(tmp_path / 'rollup.arrow'),
+                                              str(tmp_path / 'quantiles.arrow'))
+    assert (rows, duplicates, appended) == (2100, 2000, 100)
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from query_index import BITMAP_MAX_CATEGORIES, FilterIndex
+
+
+def test_filters_intersect_like_a_scan():
+    # Range, bitmap and posting-list filters combined must select exactly the rows a plain
+    # boolean scan of the frame selects
+    rng = np.random.default_rng(0)
+    size = 1000
+    data = pd.DataFrame({
+        'Age': rng.integers(18, 90, size).astype('float64'),
+        'Date of Admission': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 365, size), unit='D'),
+        'Gender': rng.choice(['Male', 'Female'], size),
+        'Hospital': [f'Hospital {i}' for i in rng.integers(0, 2 * BITMAP_MAX_CATEGORIES, size)],
+    })
+    data.loc[::50, 'Age'] = np.nan
+    index = FilterIndex(data, ['Age', 'Date of Admission'], ['Gender', 'Hospital'])
+    assert 'Hospital' in index.postings and 'Gender' in index.bitmaps
+
+    start, end = pd.Timestamp('2020-03-01'), pd.Timestamp('2020-09-30')
+    hospitals = ['Hospital 1', 'Hospital 7', 'Hospital 100', 'Nowhere']
+    selected = index.select(ranges={'Age': (30, 60), 'Date of Admission': (start, end)},
+                            categories={'Gender': ['Female'], 'Hospital': hospitals})
+
+    expected = (data['Age'].between(30, 60) & data['Date of Admission'].between(start, end)
+                & (data['Gender'] == 'Female') & data['Hospital'].isin(hospitals))
+    assert selected.tolist() == np.flatnonzero(expected).tolist()
+    assert index.select() is None
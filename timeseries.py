@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from rollups import LENGTH_OF_STAY, length_of_stay
+
+# Admissions over time. Rows are bucketed once, by admission day, into a small daily series of
+# counts and length-of-stay totals; weeks, months and years are rolled up from it with integer
+# bucket keys, and rolling averages come from running totals.
+GRANULARITIES = ['Day', 'Week', 'Month', 'Year']
+
+
+def daily_series(data, date_column='Date of Admission', weights=None):
+    """Admissions ('admissions') and length-of-stay totals ('los n', 'los sum', 'los sumsq') per admission day.
+
+    Every day between the first and last admission has a row, so windows over the series
+    span calendar time. Length of stay is left out when it can't be derived from `data`.
+    With `weights` (one per row), each row counts as that many admissions.
+    """
+    days = data[date_column].to_numpy().astype('datetime64[D]')
+    valid = ~np.isnat(days)
+    day_numbers = days[valid].astype('int64')
+    first = day_numbers.min() if len(day_numbers) else 0
+    offsets = day_numbers - first
+    if weights is not None:
+        weights = np.asarray(weights, dtype='float64')[valid]
+
+    columns = {'admissions': np.bincount(offsets, weights=weights)}
+    if LENGTH_OF_STAY in data.columns:
+        los = data[LENGTH_OF_STAY]
+    elif 'Discharge Date' in data.columns:
+        los = length_of_stay(data)
+    else:
+        los = None
+    if los is not None:
+        los = los.to_numpy(dtype='float64', na_value=np.nan)[valid]
+        known = ~np.isnan(los)
+        size = len(columns['admissions'])
+        known_weights = None if weights is None else weights[known]
+        scale = 1 if weights is None else known_weights
+        columns['los n'] = np.bincount(offsets[known], weights=known_weights, minlength=size)
+        columns['los sum'] = np.bincount(offsets[known], weights=los[known] * scale, minlength=size)
+        columns['los sumsq'] = np.bincount(offsets[known], weights=los[known] ** 2 * scale, minlength=size)
+
+    index = pd.DatetimeIndex((first + np.arange(len(columns['admissions']))).astype('datetime64[D]'), name=date_column)
+    return pd.DataFrame(columns, index=index.as_unit('ns'))
+
+
+def bucket_keys(days, granularity):
+    # Integer bucket of each day (days since 1970-01-01); weeks start on Monday
+    if granularity == 'Day':
+        return days
+    if granularity == 'Week':
+        return (days + 3) // 7
+    unit = {'Month': 'M', 'Year': 'Y'}[granularity]
+    return days.astype('datetime64[D]').astype(f'datetime64[{unit}]').astype('int64')
+
+
+def bucket_starts(keys, granularity):
+    # First day of each bucket
+    if granularity == 'Week':
+        keys = keys * 7 - 3
+    unit = {'Day': 'D', 'Week': 'D', 'Month': 'M', 'Year': 'Y'}[granularity]
+    return pd.DatetimeIndex(keys.astype(f'datetime64[{unit}]').astype('datetime64[ns]'))
+
+
+def resample(daily, granularity):
+    """Roll a daily_series up to `granularity`, with the average length of stay ('avg los') per bucket."""
+    days = daily.index.to_numpy().astype('datetime64[D]').astype('int64')
+    rolled = daily.groupby(bucket_keys(days, granularity)).sum()
+    rolled.index = bucket_starts(rolled.index.to_numpy(), granularity)
+    if 'los sum' in rolled.columns:
+        rolled['avg los'] = rolled['los sum'] / rolled['los n'].where(rolled['los n'] > 0)
+    return rolled
+
+
+def rolling(rolled, window):
+    """Averages over the last `window` buckets of a resampled series, from running totals:
+    admissions per bucket and the length of stay of every admission in the window."""
+    totals = rolled[[col for col in ['admissions', 'los n', 'los sum'] if col in rolled.columns]].cumsum()
+    windowed = totals - totals.shift(window, fill_value=0)
+    averaged = pd.DataFrame(index=rolled.index)
+    averaged['admissions'] = windowed['admissions'] / np.minimum(np.arange(1, len(rolled) + 1), window)
+    if 'los sum' in windowed.columns:
+        averaged['avg los'] = windowed['los sum'] / windowed['los n'].where(windowed['los n'] > 0)
+    return averaged
+
+
+def over_time(daily, granularity, window=1):
+    """Admissions and average length of stay per `granularity` bucket, averaged over the last
+    `window` buckets when `window` is more than 1."""
+    rolled = resample(daily, granularity)
+    return rolled if window <= 1 else rolling(rolled, window)
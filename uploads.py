@@ -0,0 +1,151 @@
+import hashlib
+import os
+
+import pandas as pd
+
+from cleaning import read_chunks
+from data_profile import Profiler, write_profile
+from data_store import CATEGORICAL_COLUMNS, DATE_COLUMNS, StoreWriter, fill_and_strip
+from date_parsing import detect_date_format, parse_dates
+from quantiles import build_sketches, merge_sketches, write_sketches
+from rollups import LENGTH_OF_STAY, build_rollup, merge_rollups, write_rollup
+
+# Cleaned uploads are kept in the columnar format, keyed by a hash of the file's content,
+# so uploading the same file again skips parsing entirely.
+UPLOAD_CACHE_DIR = 'upload_cache'
+
+REQUIRED_COLUMNS = ["Date of Admission", "Discharge Date", "Age", "Gender", "Medical Condition", "Medication"]
+SAMPLE_ROWS = 1000
+CHUNK_SIZE = 200_000
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def validate_upload(file, sample_rows=SAMPLE_ROWS):
+    """Check the header and the first `sample_rows` rows of an uploaded CSV.
+
+    Raises ValueError describing the first problem found, before the file is parsed in full.
+    """
+    try:
+        sample = pd.read_csv(file, nrows=sample_rows)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Not a readable CSV file: {e}") from e
+    finally:
+        file.seek(0)
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in sample.columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    if sample.empty:
+        raise ValueError("The file has no data rows")
+    for col in DATE_COLUMNS:
+        if parse_dates(sample[col], errors='coerce').isna().all():
+            raise ValueError(f"Column '{col}' has no valid dates in the first {len(sample)} rows")
+    if pd.to_numeric(sample['Age'], errors='coerce').isna().all():
+        raise ValueError(f"Column 'Age' has no numeric values in the first {len(sample)} rows")
+
+
+def content_hash(file, block_size=HASH_BLOCK_SIZE):
+    # Hex digest of the whole file, read in blocks; the file is rewound afterwards
+    digest = hashlib.blake2b(digest_size=16)
+    file.seek(0)
+    for block in iter(lambda: file.read(block_size), b''):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def cache_paths(digest, cache_dir=UPLOAD_CACHE_DIR):
+    # (cleaned store, rollup) of a cached upload
+    base = os.path.join(cache_dir, digest)
+    return f'{base}.arrow', f'{base}.rollup.arrow'
+
+
+def upload_profile_path(digest, cache_dir=UPLOAD_CACHE_DIR):
+    # Profile of a cached upload's raw rows
+    return os.path.join(cache_dir, f'{digest}.profile.json')
+
+
+def upload_quantile_path(digest, cache_dir=UPLOAD_CACHE_DIR):
+    # Quantile sketches of a cached upload's cleaned rows
+    return os.path.join(cache_dir, f'{digest}.quantiles.arrow')
+
+
+def is_cached(digest, cache_dir=UPLOAD_CACHE_DIR):
+    # The rollup is written last, so its presence marks a complete entry
+    return os.path.exists(cache_paths(digest, cache_dir)[1])
+
+
+def clean_dashboard_data(data, date_formats=None):
+    """Validate and clean patient rows for the dashboard (modifies and returns `data`).
+
+    Rows with invalid dates or a negative length of stay are dropped. `date_formats`
+    remembers each date column's detected format across chunks.
+    """
+    if date_formats is None:
+        date_formats = {}
+
+    # Ensure necessary columns exist
+    for col in REQUIRED_COLUMNS:
+        if col not in data.columns:
+            raise ValueError(f"Missing required column: {col}")
+
+    # Convert dates to datetime
+    for col in DATE_COLUMNS:
+        if col not in date_formats:
+            date_formats[col] = detect_date_format(data[col])
+        data[col] = parse_dates(data[col], errors='coerce', date_format=date_formats[col])
+
+    # Drop rows with invalid dates
+    data = data.dropna(subset=DATE_COLUMNS)
+
+    # Calculate Length of Stay
+    data[LENGTH_OF_STAY] = (data['Discharge Date'] - data['Date of Admission']).dt.days
+
+    # Ensure non-negative Length of Stay
+    data = data[data[LENGTH_OF_STAY] >= 0]
+
+    # Clean other columns (e.g., remove empty values, normalize text) on their category dictionaries
+    data['Medical Condition'] = fill_and_strip(data['Medical Condition'])
+    data['Medication'] = fill_and_strip(data['Medication'])
+    return data
+
+
+def process_upload(file, digest, chunk_size=CHUNK_SIZE, progress=None, cache_dir=UPLOAD_CACHE_DIR):
+    """Parse and clean an uploaded CSV `chunk_size` rows at a time into the upload cache.
+
+    Each cleaned chunk is appended to the cached store and folded into the rollup and the
+    quantile sketches, and each raw chunk into a profile of the file, so only one chunk is held
+    in memory. `progress`, if given, is called with the fraction of the file read so far after
+    every chunk. Returns the cache paths.
+    """
+    store_path, rollup_path = cache_paths(digest, cache_dir)
+    if is_cached(digest, cache_dir):
+        return store_path, rollup_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    size = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    rollup = None
+    sketches = None
+    date_formats = {}
+    profiler = Profiler()
+
+    with StoreWriter(store_path) as store:
+        # Profiled as read, as for the raw file; cleaned with the raw numeric dtypes
+        for text, chunk in read_chunks(file, chunk_size):
+            profiler.update(text)
+            chunk = chunk.astype({col: 'category' for col in CATEGORICAL_COLUMNS if col in chunk.columns})
+            chunk = clean_dashboard_data(chunk, date_formats)
+            store.write(chunk)
+            chunk_rollup = build_rollup(chunk)
+            rollup = chunk_rollup if rollup is None else merge_rollups(rollup, chunk_rollup)
+            chunk_sketches = build_sketches(chunk)
+            sketches = chunk_sketches if sketches is None else merge_sketches(sketches, chunk_sketches)
+            if progress is not None:
+                progress(min(file.tell() / size, 1.0) if size else 1.0)
+
+    write_profile(profiler.to_dict({'path': getattr(file, 'name', None), 'size': size}),
+                  upload_profile_path(digest, cache_dir))
+    write_sketches(sketches, upload_quantile_path(digest, cache_dir))
+    write_rollup(rollup, rollup_path)
+    return store_path, rollup_path